@@ -0,0 +1,357 @@
+"""
+Generate the 12-table dataset at any scale factor
+=================================================
+Scale factor 1 is the size of /resized (5,000 customers, ~85k source rows);
+10, 100 or 1000 multiply every table except the lookup tables. Rows are drawn
+from the distributions in /resized with the helpers of generate_new_tables.py.
+
+Work is split into fixed blocks of customer ids and product ids. Each block
+has its own random stream derived from (seed, block), and ids are assigned
+from per-block row counts computed in a first pass, so the output is the
+same for a given seed whatever the number of workers. Every block writes its
+own shard:
+
+    <output-dir>/<table>/part-00000.csv
+
+All foreign keys point to ids generated in the same run: orders, addresses,
+shipping, order_items and reviews of a customer live in the customer's block;
+products and stock live in product blocks; product ids referenced by
+order_items and reviews are drawn from the full product id range.
+
+An existing output directory is replaced only if this script wrote it (it
+holds a .generated marker) or --overwrite is given.
+
+Usage:
+    python generate_scaled_dataset.py --scale-factor 10 [--workers 8] [--seed 42] [--output-dir scaled_sf10] [--overwrite]
+    python load_dataset.py --data-dir scaled_sf10
+"""
+
+import argparse
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from generate_new_tables import (
+    INPUT_PATH, SEED, STREET_NAMES, SHIPPING_STATUSES, SHIPPING_STATUS_WEIGHTS,
+    ORDER_STATUSES, ORDER_STATUS_WEIGHTS, load_source, build_lookup_tables,
+    format_addresses, stock_movements,
+)
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+# Written into every output directory, so a rerun knows it may replace it
+MARKER_FILE = ".generated"
+
+CUSTOMER_BLOCK = 5_000
+PRODUCT_BLOCK = 20_000
+CUSTOMER_STREAM = 0
+PRODUCT_STREAM = 1
+
+ADDRESS_FRACTION = 0.7
+STOCK_FRACTION = 0.3
+
+# Per-table id counters kept in the first pass, in shard order
+CUSTOMER_COUNTERS = ['customer', 'customer_address', 'order', 'order_items', 'product_review']
+PRODUCT_COUNTERS = ['product', 'stock']
+
+# ============================================================
+# TEMPLATE (distributions taken from /resized)
+# ============================================================
+
+def build_template(input_path):
+    """Column values and per-parent fan-out taken from the source CSVs"""
+    source = load_source(input_path)
+    lookups = build_lookup_tables(source['customers'], source['products'])
+    customers, products = source['customers'], source['products']
+    orders, items, reviews = source['orders'], source['order_items'], source['product_reviews']
+
+    def fan_out(child, key, parents):
+        return child.groupby(key).size().reindex(parents, fill_value=0).values
+
+    def ids_of(lookup, id_column, names):
+        return names.map(pd.Series(lookup[id_column].values, index=lookup['name'].values)).values
+
+    return {
+        'lookups': lookups,
+        'customers': {
+            'country_id': ids_of(lookups['country'], 'country_id', customers['country']),
+            'name': customers['name'].values,
+            'email': customers['email'].values,
+            'gender': customers['gender'].values,
+            'signup_date': customers['signup_date'].values,
+        },
+        'products': {
+            'category_id': ids_of(lookups['category'], 'category_id', products['category']),
+            'brand_id': ids_of(lookups['brand'], 'brand_id', products['brand']),
+            'name': products['product_name'].values,
+            'price': products['price'].values,
+            'stock_quantity': products['stock_quantity'].values,
+        },
+        'orders': {c: orders[c].values for c in ['order_date', 'payment_method', 'total_amount']},
+        'order_items': {c: items[c].values for c in ['quantity', 'unit_price']},
+        'reviews': {c: reviews[c].values for c in ['rating', 'review_text', 'review_date']},
+        'orders_per_customer': fan_out(orders, 'customer_id', customers['customer_id'].values),
+        'items_per_order': fan_out(items, 'order_id', orders['order_id'].values),
+        'reviews_per_customer': fan_out(reviews, 'customer_id', customers['customer_id'].values),
+        'base_customers': len(customers),
+        'base_products': len(products),
+    }
+
+def _pick(columns, rows):
+    return {name: values[rows] for name, values in columns.items()}
+
+# ============================================================
+# BLOCK GENERATORS
+# ============================================================
+
+# Per-process state, set once by _init_worker
+_STATE = {}
+
+def _init_worker(input_path, output_path, seed, n_customers, n_products):
+    _STATE.update(template=build_template(input_path), output_path=output_path, seed=seed,
+                  n_customers=n_customers, n_products=n_products)
+
+def _block_range(block, block_size, total):
+    start = block * block_size
+    return start, min(start + block_size, total)
+
+def _customer_fan_out(rng, n):
+    """
+    Children per customer, always the first draws of a customer block so the
+    counting pass and the generating pass agree
+    """
+    tmpl = _STATE['template']
+    orders = tmpl['orders_per_customer'][rng.integers(0, len(tmpl['orders_per_customer']), n)]
+    items = tmpl['items_per_order'][rng.integers(0, len(tmpl['items_per_order']), int(orders.sum()))]
+    addresses = np.where(rng.random(n) < ADDRESS_FRACTION, rng.integers(1, 3, n), 0)
+    # Customers with orders but no address get one default address for shipping
+    default = (addresses == 0) & (orders > 0)
+    reviews = tmpl['reviews_per_customer'][rng.integers(0, len(tmpl['reviews_per_customer']), n)]
+    return {'orders': orders, 'items': items, 'addresses': addresses, 'default': default, 'reviews': reviews}
+
+def _product_fan_out(rng, n):
+    return np.where(rng.random(n) < STOCK_FRACTION, rng.integers(1, 6, n), 0)
+
+def count_block(kind, block):
+    """Rows per table produced by one block (first pass)"""
+    seed = _STATE['seed']
+    if kind == 'customer':
+        start, end = _block_range(block, CUSTOMER_BLOCK, _STATE['n_customers'])
+        fan = _customer_fan_out(np.random.default_rng([seed, CUSTOMER_STREAM, block]), end - start)
+        return kind, block, {
+            'customer': end - start,
+            'customer_address': int(fan['addresses'].sum() + fan['default'].sum()),
+            'order': len(fan['items']),
+            'order_items': int(fan['items'].sum()),
+            'product_review': int(fan['reviews'].sum()),
+        }
+    start, end = _block_range(block, PRODUCT_BLOCK, _STATE['n_products'])
+    movements = _product_fan_out(np.random.default_rng([seed, PRODUCT_STREAM, block]), end - start)
+    return kind, block, {'product': end - start, 'stock': int(movements.sum())}
+
+def _write(table, block, df):
+    path = os.path.join(_STATE['output_path'], table, f"part-{block:05d}.csv")
+    df.to_csv(path, index=False)
+
+def _ids(start, n):
+    return np.arange(start + 1, start + n + 1, dtype=np.int64)
+
+def generate_customer_block(block, offsets):
+    """customer, customer_address, shipping, order, order_items and product_review shards"""
+    tmpl = _STATE['template']
+    rng = np.random.default_rng([_STATE['seed'], CUSTOMER_STREAM, block])
+    start, end = _block_range(block, CUSTOMER_BLOCK, _STATE['n_customers'])
+    n = end - start
+    fan = _customer_fan_out(rng, n)
+    customer_id = _ids(start, n)
+
+    customer = _pick(tmpl['customers'], rng.integers(0, tmpl['base_customers'], n))
+    _write('customer', block, pd.DataFrame({
+        'customer_id': customer_id, 'country_id': customer['country_id'], 'name': customer['name'],
+        'email': customer['email'], 'gender': customer['gender'], 'signup_date': customer['signup_date'],
+    }))
+
+    # Addresses: regular ones first per customer, then the default one if needed
+    per_customer = fan['addresses'] + fan['default']
+    owner = np.repeat(customer_id, per_customer)
+    is_default = np.repeat(fan['default'], per_customer)
+    n_regular = int((~is_default).sum())
+    address = np.empty(len(owner), dtype=object)
+    address[~is_default] = format_addresses(
+        rng.integers(0, 5, n_regular), STREET_NAMES[rng.integers(0, len(STREET_NAMES), n_regular)], rng)
+    address[is_default] = "Default Address for Customer " + pd.Series(owner[is_default]).astype(str).values
+    address_id = _ids(offsets['customer_address'], len(owner))
+    _write('customer_address', block, pd.DataFrame({
+        'customer_address_id': address_id, 'customer_id': owner, 'address': address,
+    }))
+    first_address = address_id[0] + np.cumsum(per_customer) - per_customer
+
+    # Orders and their 1-to-1 shipping rows share ids
+    n_orders = len(fan['items'])
+    order_owner = np.repeat(np.arange(n), fan['orders'])
+    order_id = _ids(offsets['order'], n_orders)
+    _write('shipping', block, pd.DataFrame({
+        'shipping_id': order_id,
+        'customer_address_id': first_address[order_owner],
+        'shipping_status': np.array(SHIPPING_STATUSES, dtype=object)[
+            rng.choice(len(SHIPPING_STATUSES), n_orders, p=SHIPPING_STATUS_WEIGHTS)],
+        'shipping_cost': np.round(rng.uniform(5, 50, n_orders), 2),
+    }))
+    order = _pick(tmpl['orders'], rng.integers(0, len(tmpl['orders']['order_date']), n_orders))
+    _write('order', block, pd.DataFrame({
+        'order_id': order_id, 'customer_id': customer_id[order_owner], 'shipping_id': order_id,
+        'order_date': order['order_date'], 'payment_method': order['payment_method'],
+        'total_amount': order['total_amount'],
+        'order_status': np.array(ORDER_STATUSES, dtype=object)[
+            rng.choice(len(ORDER_STATUSES), n_orders, p=ORDER_STATUS_WEIGHTS)],
+    }))
+
+    n_items = int(fan['items'].sum())
+    item = _pick(tmpl['order_items'], rng.integers(0, len(tmpl['order_items']['quantity']), n_items))
+    _write('order_items', block, pd.DataFrame({
+        'order_items_id': _ids(offsets['order_items'], n_items),
+        'product_id': rng.integers(1, _STATE['n_products'] + 1, n_items),
+        'order_id': np.repeat(order_id, fan['items']),
+        'quantity': item['quantity'], 'unit_price': item['unit_price'],
+    }))
+
+    n_reviews = int(fan['reviews'].sum())
+    review = _pick(tmpl['reviews'], rng.integers(0, len(tmpl['reviews']['rating']), n_reviews))
+    _write('product_review', block, pd.DataFrame({
+        'review_id': _ids(offsets['product_review'], n_reviews),
+        'product_id': rng.integers(1, _STATE['n_products'] + 1, n_reviews),
+        'customer_id': np.repeat(customer_id, fan['reviews']),
+        'rating': review['rating'], 'review_text': review['review_text'], 'review_date': review['review_date'],
+    }))
+    return block
+
+def generate_product_block(block, offsets):
+    """product and stock shards"""
+    tmpl = _STATE['template']
+    rng = np.random.default_rng([_STATE['seed'], PRODUCT_STREAM, block])
+    start, end = _block_range(block, PRODUCT_BLOCK, _STATE['n_products'])
+    n = end - start
+    movements = _product_fan_out(rng, n)
+    product_id = _ids(start, n)
+
+    product = _pick(tmpl['products'], rng.integers(0, tmpl['base_products'], n))
+    _write('product', block, pd.DataFrame({
+        'product_id': product_id,
+        'store_id': rng.integers(1, len(tmpl['lookups']['store']) + 1, n),
+        'category_id': product['category_id'], 'brand_id': product['brand_id'], 'name': product['name'],
+        'price': product['price'], 'stock_quantity': product['stock_quantity'],
+    }))
+    _write('stock', block, stock_movements(np.repeat(product_id, movements), rng, offsets['stock'] + 1))
+    return block
+
+def _generate(kind, block, offsets):
+    if kind == 'customer':
+        return generate_customer_block(block, offsets)
+    return generate_product_block(block, offsets)
+
+# ============================================================
+# PIPELINE
+# ============================================================
+
+def _prefix_offsets(counts, tables):
+    """{block: {table: rows before this block}} from the per-block counts"""
+    running = dict.fromkeys(tables, 0)
+    offsets = {}
+    for block in sorted(counts):
+        offsets[block] = dict(running)
+        for table in tables:
+            running[table] += counts[block][table]
+    return offsets, running
+
+def _check_output(output_path, input_path, overwrite):
+    """Refuse to delete a directory this script did not write, or one holding the input"""
+    output_path, input_path = os.path.abspath(output_path), os.path.abspath(input_path)
+    if os.path.commonpath([output_path, input_path]) == output_path:
+        raise ValueError(f"output directory {output_path} contains the input directory {input_path}")
+    if not os.path.exists(output_path) or overwrite:
+        return
+    if not os.path.isdir(output_path):
+        raise FileExistsError(f"{output_path} exists and is not a directory")
+    if os.listdir(output_path) and not os.path.isfile(os.path.join(output_path, MARKER_FILE)):
+        raise FileExistsError(f"{output_path} is not empty and was not written by this script; "
+                              "pass --overwrite to replace it")
+
+def generate(scale_factor, output_path, input_path=INPUT_PATH, seed=SEED, workers=None, overwrite=False):
+    start_time = time.perf_counter()
+    _check_output(output_path, input_path, overwrite)
+    template = build_template(input_path)
+    n_customers = max(int(round(template['base_customers'] * scale_factor)), 1)
+    n_products = max(int(round(template['base_products'] * scale_factor)), 1)
+    customer_blocks = range(-(-n_customers // CUSTOMER_BLOCK))
+    product_blocks = range(-(-n_products // PRODUCT_BLOCK))
+    tasks = [('customer', b) for b in customer_blocks] + [('product', b) for b in product_blocks]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+
+    print("=" * 60)
+    print(f"GENERATE DATASET - scale factor {scale_factor:g}")
+    print("=" * 60)
+    print(f"   {n_customers:,} customers in {len(customer_blocks)} blocks, "
+          f"{n_products:,} products in {len(product_blocks)} blocks, {workers} workers")
+
+    # Fresh output tree: one folder per table
+    if os.path.isdir(output_path):
+        shutil.rmtree(output_path)
+    tables = ['country', 'store', 'category', 'brand', 'customer', 'customer_address', 'shipping',
+              'product', 'order', 'order_items', 'product_review', 'stock']
+    for table in tables:
+        os.makedirs(os.path.join(output_path, table))
+    with open(os.path.join(output_path, MARKER_FILE), "w") as marker:
+        marker.write(f"scale_factor={scale_factor:g} seed={seed}\n")
+    for table in ['country', 'store', 'category', 'brand']:
+        template['lookups'][table].to_csv(os.path.join(output_path, table, "part-00000.csv"), index=False)
+
+    init_args = (input_path, output_path, seed, n_customers, n_products)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+        print("\n[1] Counting rows per block...")
+        counts = {'customer': {}, 'product': {}}
+        for kind, block, block_counts in pool.map(count_block, *zip(*tasks)):
+            counts[kind][block] = block_counts
+        customer_offsets, totals = _prefix_offsets(counts['customer'], CUSTOMER_COUNTERS)
+        product_offsets, product_totals = _prefix_offsets(counts['product'], PRODUCT_COUNTERS)
+        totals.update(product_totals)
+        offsets = {'customer': customer_offsets, 'product': product_offsets}
+
+        print("[2] Writing shards...")
+        kinds, blocks = zip(*tasks)
+        list(pool.map(_generate, kinds, blocks, [offsets[k][b] for k, b in tasks]))
+
+    totals['shipping'] = totals['order']
+    for table in ['country', 'store', 'category', 'brand']:
+        totals[table] = len(template['lookups'][table])
+
+    print("\n" + "=" * 60)
+    print(f"SUMMARY - {output_path}")
+    print("=" * 60)
+    for table in tables:
+        shards = len(os.listdir(os.path.join(output_path, table)))
+        print(f"   ✓ {table:<18} : {totals[table]:>12,} rows in {shards} shard(s)")
+    print(f"   TOTAL              : {sum(totals.values()):>12,} rows")
+    print(f"\n   Selesai dalam {time.perf_counter() - start_time:.1f}s")
+    return totals
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the 12-table dataset at a given scale factor")
+    parser.add_argument("--scale-factor", type=float, default=1.0, help="1 = size of /resized")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--input-dir", default=INPUT_PATH, help="source CSVs used as value distributions")
+    parser.add_argument("--output-dir", default=None, help="default: scaled_sf<scale-factor>")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="replace a non-empty output directory this script did not write")
+    args = parser.parse_args()
+
+    if args.scale_factor <= 0:
+        parser.error("--scale-factor must be positive")
+    output_dir = args.output_dir or os.path.join(BASE_PATH, f"scaled_sf{args.scale_factor:g}")
+    try:
+        generate(args.scale_factor, output_dir, args.input_dir, args.seed, args.workers, args.overwrite)
+    except (FileExistsError, ValueError) as e:
+        parser.error(str(e))
@@ -0,0 +1,225 @@
+"""
+Bulk loader untuk dataset 12 tabel ke PostgreSQL / Supabase
+===========================================================
+Script ini akan:
+1. Membuat ulang tabel dari supabase_ddl.sql TANPA primary key, index dan FK
+2. Streaming setiap CSV lewat COPY FROM STDIN (beberapa tabel paralel)
+3. Setelah data masuk: primary key, index, foreign key, sequence, ANALYZE
+4. Melaporkan rows/second per tabel
+
+Usage:
+    python load_dataset.py [--data-dir resized_new] [--workers 4]
+DATABASE_URL diambil dari environment atau visualisasi/.env
+"""
+
+import argparse
+import csv
+import glob
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import psycopg2
+from dotenv import load_dotenv
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_DIR = os.path.join(BASE_PATH, "resized_new")
+DEFAULT_DDL = os.path.join(BASE_PATH, "supabase_ddl.sql")
+
+# ============================================================
+# 1. PARSE DDL
+# ============================================================
+
+def _quote(name):
+    return '"' + name.strip('"') + '"'
+
+def parse_ddl(ddl_path):
+    """
+    Split the DDL into what is needed before and after the data load.
+    Returns a dict with ordered 'tables' {name: bare CREATE TABLE},
+    'primary_keys' {name: column}, 'serials' {name: column},
+    'foreign_keys' [ALTER TABLE ...] and 'indexes' [CREATE INDEX ...].
+    """
+    with open(ddl_path, encoding="utf-8") as f:
+        ddl = re.sub(r'--[^\n]*', '', f.read())
+
+    plan = {'tables': {}, 'primary_keys': {}, 'serials': {}, 'foreign_keys': [], 'indexes': []}
+    for statement in (s.strip() for s in ddl.split(';')):
+        table_match = re.match(r'CREATE\s+TABLE\s+("?\w+"?)\s*\((.*)\)\s*$', statement, re.IGNORECASE | re.DOTALL)
+        if table_match:
+            raw_name, body = table_match.groups()
+            table = raw_name.strip('"')
+            for name, columns, ref_table, ref_columns in re.findall(
+                    r'CONSTRAINT\s+(\w+)\s+FOREIGN\s+KEY\s*\(([^)]*)\)\s*REFERENCES\s+("?\w+"?)\s*\(([^)]*)\)',
+                    body, re.IGNORECASE):
+                plan['foreign_keys'].append(
+                    f"ALTER TABLE {_quote(table)} ADD CONSTRAINT {name} "
+                    f"FOREIGN KEY ({columns}) REFERENCES {_quote(ref_table)} ({ref_columns})"
+                )
+            pk = re.search(r'^\s*(\w+)\s+\w+[^,\n]*PRIMARY\s+KEY', body, re.IGNORECASE | re.MULTILINE)
+            if pk:
+                plan['primary_keys'][table] = pk.group(1)
+            serial = re.search(r'^\s*(\w+)\s+SERIAL\b', body, re.IGNORECASE | re.MULTILINE)
+            if serial:
+                plan['serials'][table] = serial.group(1)
+            # Bare table: no PK, no FK; defaults and CHECKs stay
+            bare = re.sub(r',\s*CONSTRAINT\s+\w+\s+FOREIGN\s+KEY[^,]*?REFERENCES\s+"?\w+"?\s*\([^)]*\)', '', statement,
+                          flags=re.IGNORECASE)
+            bare = re.sub(r'\s+PRIMARY\s+KEY', '', bare, flags=re.IGNORECASE)
+            plan['tables'][table] = bare
+        elif re.match(r'CREATE\s+(UNIQUE\s+)?INDEX', statement, re.IGNORECASE):
+            plan['indexes'].append(statement)
+    return plan
+
+# ============================================================
+# 2. LOAD
+# ============================================================
+
+def connect(dsn):
+    conn = psycopg2.connect(dsn)
+    with conn.cursor() as cur:
+        # Bulk load: an interrupted load is simply re-run
+        cur.execute("SET synchronous_commit = off")
+        cur.execute("SET statement_timeout = 0")
+    conn.commit()
+    return conn
+
+def csv_files(data_dir, table):
+    """CSV file(s) for ``table``: <table>.csv, or the shards in <table>/*.csv"""
+    path = os.path.join(data_dir, f"{table}.csv")
+    if os.path.exists(path):
+        return [path]
+    return sorted(glob.glob(os.path.join(data_dir, table, "*.csv")))
+
+def copy_table(dsn, table, paths):
+    """Stream ``paths`` into ``table`` with COPY; returns (table, rows, seconds)"""
+    start = time.perf_counter()
+    rows = 0
+    conn = connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            for path in paths:
+                with open(path, encoding="utf-8", newline="") as f:
+                    header = next(csv.reader([f.readline()]))
+                    columns = ", ".join(_quote(c) for c in header)
+                    cur.copy_expert(
+                        f"COPY {_quote(table)} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                        f, size=1 << 20
+                    )
+                    rows += cur.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    return table, rows, time.perf_counter() - start
+
+def run_parallel(dsn, statements, workers):
+    """Execute independent statements concurrently, one connection each"""
+    def run(sql):
+        conn = connect(dsn)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+            conn.commit()
+        finally:
+            conn.close()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(run, sql) for sql in statements]):
+            future.result()
+
+def load(dsn, data_dir, ddl_path, workers):
+    plan = parse_ddl(ddl_path)
+    tables = list(plan['tables'])
+    timings = {}
+
+    print("=" * 60)
+    print("BULK LOAD DATASET")
+    print("=" * 60)
+
+    # Recreate bare tables (reverse dependency order for DROP)
+    print("\n[1] Creating tables without keys or indexes...")
+    start = time.perf_counter()
+    conn = connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            for table in reversed(tables):
+                cur.execute(f"DROP TABLE IF EXISTS {_quote(table)} CASCADE")
+            for table in tables:
+                cur.execute(plan['tables'][table])
+        conn.commit()
+    finally:
+        conn.close()
+    timings['create'] = time.perf_counter() - start
+
+    # Without constraints the tables no longer depend on each other, so all of
+    # them load concurrently; the largest files start first
+    print(f"\n[2] COPY FROM STDIN ({workers} workers)...")
+    start = time.perf_counter()
+    jobs = {t: csv_files(data_dir, t) for t in tables}
+    missing = [t for t, paths in jobs.items() if not paths]
+    ordered = sorted((t for t in tables if jobs[t]), key=lambda t: -sum(os.path.getsize(p) for p in jobs[t]))
+    total_rows = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(copy_table, dsn, t, jobs[t]) for t in ordered]
+        for future in as_completed(futures):
+            table, rows, seconds = future.result()
+            total_rows += rows
+            print(f"    {table:<18} {rows:>12,} rows  {seconds:7.2f}s  {rows / max(seconds, 1e-9):>12,.0f} rows/s")
+    for table in missing:
+        print(f"    {table:<18} (no CSV, left empty)")
+    timings['copy'] = time.perf_counter() - start
+
+    print("\n[3] Primary keys and indexes...")
+    start = time.perf_counter()
+    run_parallel(dsn, [f"ALTER TABLE {_quote(t)} ADD PRIMARY KEY ({c})" for t, c in plan['primary_keys'].items()], workers)
+    run_parallel(dsn, plan['indexes'], workers)
+    timings['indexes'] = time.perf_counter() - start
+
+    # ADD FOREIGN KEY locks both tables; run them one at a time
+    print("\n[4] Foreign keys...")
+    start = time.perf_counter()
+    conn = connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            for statement in plan['foreign_keys']:
+                cur.execute(statement)
+            # Serial columns continue after the loaded ids
+            for table, column in plan['serials'].items():
+                cur.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{_quote(table)}', '{column}'), "
+                    f"COALESCE(MAX({column}), 0) + 1, false) FROM {_quote(table)}"
+                )
+        conn.commit()
+    finally:
+        conn.close()
+    timings['foreign_keys'] = time.perf_counter() - start
+
+    print("\n[5] ANALYZE...")
+    start = time.perf_counter()
+    run_parallel(dsn, [f"ANALYZE {_quote(t)}" for t in tables], workers)
+    timings['analyze'] = time.perf_counter() - start
+
+    elapsed = sum(timings.values())
+    print("\n" + "=" * 60)
+    print(f"Loaded {total_rows:,} rows into {len(tables)} tables in {elapsed:.2f}s "
+          f"({total_rows / max(timings['copy'], 1e-9):,.0f} rows/s during COPY)")
+    print("  " + ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items()))
+    print("=" * 60)
+
+def libpq_dsn(url):
+    """psycopg2 accepts postgresql:// URLs but not SQLAlchemy's +driver suffix"""
+    return re.sub(r'^postgres(ql)?\+\w+://', 'postgresql://', url)
+
+if __name__ == "__main__":
+    load_dotenv(os.path.join(BASE_PATH, "visualisasi", ".env"))
+
+    parser = argparse.ArgumentParser(description="Bulk-load the CSV dataset with COPY, building indexes afterwards")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="defaults to DATABASE_URL")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="folder with one CSV (or one folder of CSV shards) per table")
+    parser.add_argument("--ddl", default=DEFAULT_DDL, help="schema file (default: supabase_ddl.sql)")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent COPY / index connections")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("DATABASE_URL is not set (use --database-url or visualisasi/.env)")
+    load(libpq_dsn(args.database_url), args.data_dir, args.ddl, max(args.workers, 1))
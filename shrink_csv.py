@@ -1,72 +1,188 @@
-import pandas as pd
+"""
+Shrink the original e-commerce CSV export into /resized
+=======================================================
+Samples MAX_CUSTOMERS customers and keeps only the rows that reference them
+(orders -> order_items -> products, product_reviews).
+
+Every source file is streamed in chunks and written out incrementally; id
+membership is kept in sorted NumPy arrays, so memory grows with the size of
+the subset, not with the size of the source files. Values are copied through
+as text, exactly as they appear in the source.
+
+Usage:
+    python shrink_csv.py [--source-dir .] [--output-dir resized] [--max-customers 5000] [--seed 42]
+"""
+
+import argparse
 import os
+import numpy as np
+import pandas as pd
 
 # =============================================================================
 # CONFIG: Adjust MAX_CUSTOMERS to control total dataset size
 # With 5000 customers, expect ~85k total rows across all tables
 # =============================================================================
 MAX_CUSTOMERS = 5_000  # Reduced from 50k to keep data manageable
+SEED = 42
+CHUNK_ROWS = 200_000
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def read_chunks(path, chunk_rows, usecols=None):
+    """CSV chunks with every value kept as its source text"""
+    return pd.read_csv(path, dtype=str, keep_default_na=False, na_filter=False,
+                       usecols=usecols, chunksize=chunk_rows)
+
+def ids(column):
+    """Id column of a text chunk as int64 (blank ids become -1 and never match)"""
+    return pd.to_numeric(column, errors="coerce").fillna(-1).astype(np.int64).values
+
+def contains(sorted_ids, values):
+    """Vectorized membership test against a sorted unique id array"""
+    if len(sorted_ids) == 0:
+        return np.zeros(len(values), dtype=bool)
+    pos = np.searchsorted(sorted_ids, values)
+    pos[pos == len(sorted_ids)] = 0
+    return sorted_ids[pos] == values
+
+def merge_ids(parts):
+    """Sorted unique id array from a list of id arrays"""
+    return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+class ChunkWriter:
+    """Appends filtered chunks to one output CSV, header written once"""
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._header = True
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, chunk):
+        if len(chunk) == 0 and not self._header:
+            return
+        chunk.to_csv(self.path, mode="a", header=self._header, index=False)
+        self._header = False
+        self.rows += len(chunk)
+
+def stream_filter(path, out_path, keep, chunk_rows):
+    """
+    Write the rows of ``path`` for which ``keep(chunk)`` is True to ``out_path``.
+    ``keep`` returns a boolean mask and may collect ids from the kept rows.
+    """
+    writer = ChunkWriter(out_path)
+    for chunk in read_chunks(path, chunk_rows):
+        writer.write(chunk[keep(chunk)])
+    return writer.rows
+
+# =============================================================================
+# CUSTOMER SAMPLE
+# =============================================================================
+
+def sample_positions(path, n, seed, chunk_rows):
+    """
+    Row positions (sorted) of the customer sample: n distinct rows drawn
+    with default_rng(seed). For a sample small against the source, choice()
+    without replacement keeps only the drawn positions instead of
+    permuting every row. The draw differs from the DataFrame.sample(n=n,
+    random_state=seed) the script used before, so a given seed now selects
+    other customers than the original /resized.
+    """
+    total = sum(len(chunk) for chunk in read_chunks(path, chunk_rows, usecols=[0]))
+    n = min(n, total)
+    return np.sort(np.random.default_rng(seed).choice(total, size=n, replace=False))
+
+def shrink(source_dir, output_dir, max_customers=MAX_CUSTOMERS, seed=SEED, chunk_rows=CHUNK_ROWS):
+    os.makedirs(output_dir, exist_ok=True)
+    src = lambda name: os.path.join(source_dir, name)
+    dst = lambda name: os.path.join(output_dir, name)
+    counts = {}
+
+    print("Streaming original CSV files...")
+
+    # 1. Ambil subset customer (random sample)
+    print("  - customers.csv...")
+    positions = sample_positions(src("customers.csv"), max_customers, seed, chunk_rows)
+    customer_parts = []
+    offset = 0
+
+    def keep_customer(chunk):
+        nonlocal offset
+        lo, hi = np.searchsorted(positions, [offset, offset + len(chunk)])
+        mask = np.zeros(len(chunk), dtype=bool)
+        mask[positions[lo:hi] - offset] = True
+        offset += len(chunk)
+        customer_parts.append(ids(chunk["customer_id"][mask]))
+        return mask
+
+    counts["customers.csv"] = stream_filter(src("customers.csv"), dst("customers.csv"), keep_customer, chunk_rows)
+    customer_ids = merge_ids(customer_parts)
+    print(f"    Selected {counts['customers.csv']:,} customers")
+
+    # 2. Filter orders berdasarkan customer_id tadi
+    print("  - orders.csv...")
+    order_parts = []
+
+    def keep_order(chunk):
+        mask = contains(customer_ids, ids(chunk["customer_id"]))
+        order_parts.append(ids(chunk["order_id"][mask]))
+        return mask
+
+    counts["orders.csv"] = stream_filter(src("orders.csv"), dst("orders.csv"), keep_order, chunk_rows)
+    order_ids = merge_ids(order_parts)
+    print(f"    Filtered to {counts['orders.csv']:,} orders")
+
+    # 3. Filter order_items berdasarkan order_id
+    print("  - order_items.csv...")
+    product_parts = []
+
+    def keep_item(chunk):
+        mask = contains(order_ids, ids(chunk["order_id"]))
+        # Deduplicate per chunk so the pending list stays small
+        product_parts.append(np.unique(ids(chunk["product_id"][mask])))
+        return mask
+
+    counts["order_items.csv"] = stream_filter(src("order_items.csv"), dst("order_items.csv"), keep_item, chunk_rows)
+    del order_ids
+    product_ids = merge_ids(product_parts)
+    print(f"    Filtered to {counts['order_items.csv']:,} order_items")
+
+    # 4. Filter products berdasarkan product_ids yang kepakai
+    print("  - products.csv...")
+    counts["products.csv"] = stream_filter(
+        src("products.csv"), dst("products.csv"),
+        lambda chunk: contains(product_ids, ids(chunk["product_id"])), chunk_rows)
+    print(f"    Filtered to {counts['products.csv']:,} products")
+
+    # 5. Filter product_reviews
+    print("  - product_reviews.csv...")
+    counts["product_reviews.csv"] = stream_filter(
+        src("product_reviews.csv"), dst("product_reviews.csv"),
+        lambda chunk: contains(customer_ids, ids(chunk["customer_id"]))
+        & contains(product_ids, ids(chunk["product_id"])), chunk_rows)
+    print(f"    Filtered to {counts['product_reviews.csv']:,} reviews")
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Referentially consistent customer subset of the source CSVs")
+    parser.add_argument("--source-dir", default=".", help="folder with the original CSV export")
+    parser.add_argument("--output-dir", default="resized")
+    parser.add_argument("--max-customers", type=int, default=MAX_CUSTOMERS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows read per chunk")
+    args = parser.parse_args()
+
+    counts = shrink(args.source_dir, args.output_dir, args.max_customers, args.seed, max(args.chunk_rows, 1))
 
-# Create output directory
-os.makedirs("resized", exist_ok=True)
-
-print("Loading original CSV files...")
-
-# 1. Ambil subset customer (random sample)
-print("  - Loading customers.csv...")
-customers = pd.read_csv("customers.csv")
-customers_small = customers.sample(n=MAX_CUSTOMERS, random_state=42)
-customer_ids = set(customers_small["customer_id"])
-print(f"    Selected {len(customers_small):,} customers")
-
-# 2. Filter orders berdasarkan customer_id tadi
-print("  - Loading orders.csv...")
-orders = pd.read_csv("orders.csv")
-orders_small = orders[orders["customer_id"].isin(customer_ids)]
-order_ids = set(orders_small["order_id"])
-print(f"    Filtered to {len(orders_small):,} orders")
-
-# 3. Filter order_items berdasarkan order_id
-print("  - Loading order_items.csv...")
-order_items = pd.read_csv("order_items.csv")
-order_items_small = order_items[order_items["order_id"].isin(order_ids)]
-product_ids = set(order_items_small["product_id"])
-print(f"    Filtered to {len(order_items_small):,} order_items")
-
-# 4. Filter products berdasarkan product_ids yang kepakai
-print("  - Loading products.csv...")
-products = pd.read_csv("products.csv")
-products_small = products[products["product_id"].isin(product_ids)]
-print(f"    Filtered to {len(products_small):,} products")
-
-# 5. Filter product_reviews
-print("  - Loading product_reviews.csv...")
-reviews = pd.read_csv("product_reviews.csv")
-reviews_small = reviews[
-    reviews["customer_id"].isin(customer_ids)
-    & reviews["product_id"].isin(product_ids)
-]
-print(f"    Filtered to {len(reviews_small):,} reviews")
-
-# 6. Simpan ke folder resized
-print("\nSaving to resized/ folder...")
-customers_small.to_csv("resized/customers.csv", index=False)
-products_small.to_csv("resized/products.csv", index=False)
-orders_small.to_csv("resized/orders.csv", index=False)
-order_items_small.to_csv("resized/order_items.csv", index=False)
-reviews_small.to_csv("resized/product_reviews.csv", index=False)
-
-# Summary
-print("\n" + "=" * 60)
-print("SHRINK COMPLETE - Summary:")
-print("=" * 60)
-print(f"  customers.csv      : {len(customers_small):>10,} rows")
-print(f"  products.csv       : {len(products_small):>10,} rows")
-print(f"  orders.csv         : {len(orders_small):>10,} rows")
-print(f"  order_items.csv    : {len(order_items_small):>10,} rows")
-print(f"  product_reviews.csv: {len(reviews_small):>10,} rows")
-print("-" * 60)
-total = len(customers_small) + len(products_small) + len(orders_small) + len(order_items_small) + len(reviews_small)
-print(f"  TOTAL              : {total:>10,} rows")
-print("=" * 60)
-print("\nFiles saved to: resized/")
+    # Summary
+    print("\n" + "=" * 60)
+    print("SHRINK COMPLETE - Summary:")
+    print("=" * 60)
+    for name in ["customers.csv", "products.csv", "orders.csv", "order_items.csv", "product_reviews.csv"]:
+        print(f"  {name:<19}: {counts[name]:>10,} rows")
+    print("-" * 60)
+    print(f"  {'TOTAL':<19}: {sum(counts.values()):>10,} rows")
+    print("=" * 60)
+    print(f"\nFiles saved to: {args.output_dir}/")
@@ -197,6 +197,11 @@ CREATE INDEX idx_review_rating ON product_review (rating);
 
 CREATE INDEX idx_stock_date ON stock (change_date);
 
+-- Watermark kolom untuk refresh inkremental grafik tren bulanan
+CREATE INDEX idx_review_date ON product_review (review_date);
+
+CREATE INDEX idx_customer_signup ON customer (signup_date);
+
 -- ============================================================
 -- CATATAN IMPORT CSV ke Supabase:
 -- ============================================================
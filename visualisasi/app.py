@@ -3,8 +3,12 @@ E-Commerce Analytics Dashboard - Main Application
 Modular structure with separated page components
 """
 import streamlit as st
-from config import APP_TITLE, APP_ICON, PAGE_LAYOUT, CUSTOM_CSS, TABLES, engine
-from page_modules import overview, customer, product, order, shipping, review, store_brand, stock, data_explorer
+from config import APP_TITLE, APP_ICON, PAGE_LAYOUT, CUSTOM_CSS, TABLES, DB_BACKEND, engine
+from page_modules import PAGES, PAGES_BY_TITLE, load as load_page
+from utils import filters, telemetry, warmup
+from utils.database import prefetch
+
+FILTER_LABELS = {'country': "Country", 'category': "Category", 'store': "Store", 'status': "Order status"}
 
 # Page configuration
 st.set_page_config(
@@ -26,9 +30,15 @@ st.caption("Visualisasi Data dari 12 Tabel Relasional - Synthetic E-Commerce Dat
 
 # Check database connection
 if engine is None:
-    st.error("DATABASE_URL belum diset. Silakan copy `.env.example` ke `.env` dan isi `DATABASE_URL`.")
+    st.error(
+        "DATABASE_URL belum diset. Silakan copy `.env.example` ke `.env` dan isi `DATABASE_URL`, "
+        "atau set `DB_BACKEND=duckdb` untuk memakai database lokal dari `resized_new/`."
+    )
     st.stop()
 
+# Fill the result caches in the background (started once per process)
+warmup.start()
+
 # ============================================================
 # SIDEBAR NAVIGATION
 # ============================================================
@@ -41,19 +51,36 @@ with st.sidebar:
     )
     st.header("Dashboard Navigation")
     
-    page = st.selectbox("Pilih Halaman", [
-        "Overview Dashboard",
-        "Customer Analytics",
-        "Product Analytics",
-        "Order Analytics",
-        "Shipping Analytics",
-        "Review Analytics",
-        "Store & Brand Analytics",
-        "Stock Movement",
-        "Data Explorer"
-    ])
+    page = st.selectbox("Pilih Halaman", [p['title'] for p in PAGES])
     
     st.divider()
+    st.markdown("### Filters")
+    # Always rendered so the selection survives a visit to an unfiltered page
+    filtered = PAGES_BY_TITLE[page]['filtered']
+    options = prefetch(filters.OPTION_QUERIES)
+    # Plain Python values, so they bind as query parameters
+    labels = {
+        name: dict(zip(df['value'].tolist(), df['label'].tolist())) if not df.empty else {}
+        for name, df in options.items()
+    }
+    date_range = st.date_input("Date range", value=[], key="filter_date", disabled=not filtered)
+    selected = {
+        name: st.multiselect(label, list(labels[name]), format_func=labels[name].get,
+                             key=f"filter_{name}", disabled=not filtered)
+        for name, label in FILTER_LABELS.items()
+    }
+    active = filters.context(date_range, **selected)
+    # Every page query expands its filter placeholders from this context. Set
+    # on every run: the script thread is reused, so a cleared filter must not
+    # keep the previous run's value
+    filters.current.set(active if filtered else {})
+    if not filtered:
+        st.caption("Filters apply to the dashboard pages only")
+    elif active:
+        st.caption(f"Filtered: {filters.describe(active, labels)}")
+    
+    st.divider()
+    st.caption(f"Backend: {'DuckDB (local)' if DB_BACKEND == 'duckdb' else 'PostgreSQL'}")
     st.markdown("### Database Tables")
     for t in TABLES:
         st.markdown(f"- `{t}`")
@@ -61,24 +88,26 @@ with st.sidebar:
 # ============================================================
 # PAGE ROUTING
 # ============================================================
-if page == "Overview Dashboard":
-    overview.render()
-elif page == "Customer Analytics":
-    customer.render()
-elif page == "Product Analytics":
-    product.render()
-elif page == "Order Analytics":
-    order.render()
-elif page == "Shipping Analytics":
-    shipping.render()
-elif page == "Review Analytics":
-    review.render()
-elif page == "Store & Brand Analytics":
-    store_brand.render()
-elif page == "Stock Movement":
-    stock.render()
-elif page == "Data Explorer":
-    data_explorer.render()
+telemetry.current_page.set(page)
+
+# Let the page that was left release what it holds (e.g. an open cursor)
+previous = st.session_state.get('rendered_page')
+if previous is not None and previous != page:
+    left = load_page(PAGES_BY_TITLE[previous])
+    if hasattr(left, "leave"):
+        left.leave()
+st.session_state.rendered_page = page
+
+# Page heading from the registry; the module renders everything below it
+entry = PAGES_BY_TITLE[page]
+st.markdown(
+    f'<div class="icon-title"><span class="material-icons">{entry["icon"]}</span>'
+    f'<h2 style="display:inline;">{entry.get("heading", entry["title"])}</h2></div>',
+    unsafe_allow_html=True
+)
+
+# Only the selected page's module (and its plotting imports) is loaded
+load_page(entry).render()
 
 # ============================================================
 # FOOTER
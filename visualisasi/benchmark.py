@@ -0,0 +1,194 @@
+"""
+Dashboard query benchmark - every page panel and SQL editor example
+Usage: python benchmark.py [--scale-factors 1,10] [--repeat 5] [--save-baseline] [--compare]
+
+Each scale factor runs against its own embedded DuckDB file built from
+scaled_sf<N>/ (generated with generate_scaled_dataset.py when missing);
+--configured runs against the engine from config.py instead (e.g. Supabase).
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import numpy as np
+from config import PROJECT_ROOT, DUCKDB_PATH, SCHEMA_DDL_PATH, get_local_engine
+from utils.database import collect_sql
+from utils.query_control import apply_timeout
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# A panel regresses when its p50 grows by both this ratio and this many ms
+REGRESSION_RATIO = 0.25
+REGRESSION_MIN_MS = 5.0
+
+def _hash(text):
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()[:12]
+
+def dashboard_statements():
+    """{'page/panel': sql} for every page with tasks() plus the SQL editor examples"""
+    import page_modules
+    from page_modules.data_explorer import EXAMPLE_QUERIES
+
+    statements = {}
+    for page in page_modules.PAGES:
+        module = page_modules.load(page)
+        if not hasattr(module, "tasks"):
+            continue
+        for panel, sqls in collect_sql(module.tasks()).items():
+            for idx, sql in enumerate(sqls):
+                suffix = f"#{idx + 1}" if len(sqls) > 1 else ""
+                statements[f"{page['module']}/{panel}{suffix}"] = sql
+    for name, sql in EXAMPLE_QUERIES.items():
+        statements[f"data_explorer/{name}"] = sql
+    return statements
+
+def index_fingerprint(engine):
+    """Hash of the live index definitions, so index changes show up in a diff"""
+    if engine.dialect.name == "duckdb":
+        sql = "SELECT sql FROM duckdb_indexes() ORDER BY 1"
+    else:
+        sql = "SELECT indexdef FROM pg_indexes WHERE schemaname = 'public' ORDER BY 1"
+    with engine.connect() as conn:
+        return _hash("\n".join(str(row[0]) for row in conn.exec_driver_sql(sql)))
+
+def time_statement(engine, sql, repeat, timeout_ms):
+    """Run ``sql`` once to warm up, then ``repeat`` times; returns the panel stats"""
+    latencies = []
+    rows = 0
+    try:
+        with engine.connect() as conn:
+            for attempt in range(repeat + 1):
+                with conn.begin() as trans:
+                    apply_timeout(conn, timeout_ms)
+                    start = time.perf_counter()
+                    rows = len(conn.exec_driver_sql(sql).fetchall())
+                    elapsed = (time.perf_counter() - start) * 1000
+                    trans.rollback()
+                if attempt:
+                    latencies.append(elapsed)
+    except Exception as e:
+        return {'sql_hash': _hash(sql), 'rows': None, 'p50_ms': None, 'p95_ms': None, 'max_ms': None,
+                'error': str(e).splitlines()[0]}
+    return {
+        'sql_hash': _hash(sql),
+        'rows': rows,
+        'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 3),
+        'max_ms': round(max(latencies), 3),
+        'error': None,
+    }
+
+def scale_engine(scale_factor):
+    """Engine over a DuckDB file loaded at ``scale_factor``"""
+    dataset_dir = os.path.join(PROJECT_ROOT, f"scaled_sf{scale_factor:g}")
+    if not os.path.isdir(dataset_dir):
+        sys.path.insert(0, PROJECT_ROOT)
+        from generate_scaled_dataset import generate
+        generate(scale_factor, dataset_dir, workers=os.cpu_count())
+    path = os.path.join(os.path.dirname(DUCKDB_PATH), f"bench_sf{scale_factor:g}.duckdb")
+    return get_local_engine(path, dataset_dir)
+
+def run(targets, repeat, timeout_ms):
+    """targets: [(label, engine_factory)]; returns the benchmark document"""
+    statements = dashboard_statements()
+    with open(SCHEMA_DDL_PATH, encoding="utf-8") as f:
+        schema_hash = _hash(f.read())
+    doc = {'created': time.strftime("%Y-%m-%d %H:%M:%S"), 'repeat': repeat, 'schema_hash': schema_hash, 'scales': {}}
+    for label, factory in targets:
+        engine = factory()
+        try:
+            print(f"\n== {label} ({engine.dialect.name}, {len(statements)} statements x {repeat}) ==")
+            print(f"{'panel':<52} {'rows':>9} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+            results = {}
+            for key, sql in statements.items():
+                stats = time_statement(engine, sql, repeat, timeout_ms)
+                results[key] = stats
+                if stats['error']:
+                    print(f"{key:<52} ERROR {stats['error'][:60]}")
+                else:
+                    print(f"{key:<52} {stats['rows']:>9,} {stats['p50_ms']:>10.1f} "
+                          f"{stats['p95_ms']:>10.1f} {stats['max_ms']:>10.1f}")
+            doc['scales'][label] = {'backend': engine.dialect.name, 'index_hash': index_fingerprint(engine),
+                                    'results': results}
+        finally:
+            engine.dispose()
+    return doc
+
+def compare(current, baseline):
+    """Print the differences from ``baseline``; returns the number of regressions"""
+    regressions = 0
+    print("\n" + "=" * 60)
+    print(f"DIFF against baseline from {baseline.get('created')}")
+    print("=" * 60)
+    if current['schema_hash'] != baseline.get('schema_hash'):
+        print("  schema changed (supabase_ddl.sql)")
+    for label, scale in current['scales'].items():
+        base = baseline.get('scales', {}).get(label)
+        if base is None:
+            print(f"  [{label}] not in baseline")
+            continue
+        if scale['index_hash'] != base.get('index_hash'):
+            print(f"  [{label}] indexes changed")
+        base_results = base.get('results', {})
+        for key, stats in scale['results'].items():
+            old = base_results.get(key)
+            if old is None:
+                print(f"  [{label}] {key}: new panel")
+                continue
+            notes = []
+            if stats['sql_hash'] != old.get('sql_hash'):
+                notes.append("query changed")
+            if stats['error'] and not old.get('error'):
+                notes.append(f"now fails: {stats['error'][:60]}")
+                regressions += 1
+            elif stats['rows'] != old.get('rows') and not stats['error']:
+                notes.append(f"rows {old.get('rows')} -> {stats['rows']}")
+            if stats['p50_ms'] is not None and old.get('p50_ms') is not None:
+                before, after = old['p50_ms'], stats['p50_ms']
+                if after > before * (1 + REGRESSION_RATIO) and after - before > REGRESSION_MIN_MS:
+                    notes.append(f"REGRESSION p50 {before:.1f} -> {after:.1f} ms")
+                    regressions += 1
+                elif before > after * (1 + REGRESSION_RATIO) and before - after > REGRESSION_MIN_MS:
+                    notes.append(f"faster p50 {before:.1f} -> {after:.1f} ms")
+            if notes:
+                print(f"  [{label}] {key}: " + "; ".join(notes))
+        for key in base_results.keys() - scale['results'].keys():
+            print(f"  [{label}] {key}: removed")
+    print(f"\n{regressions} regression(s)")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale-factors", default="1", help="comma-separated, e.g. 1,10,100")
+    parser.add_argument("--configured", action="store_true", help="benchmark the engine from config.py instead")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per statement (after one warm-up)")
+    parser.add_argument("--timeout-ms", type=int, default=60000, help="statement timeout (PostgreSQL only)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="diff against the baseline; exit 1 on regressions")
+    args = parser.parse_args()
+
+    if args.configured:
+        import config
+        if config.engine is None:
+            parser.error("no database engine configured (DATABASE_URL or DB_BACKEND=duckdb)")
+        targets = [("configured", lambda: config.engine)]
+    else:
+        factors = [float(f) for f in args.scale_factors.split(",") if f.strip()]
+        targets = [(f"sf{f:g}", lambda f=f: scale_engine(f)) for f in factors]
+
+    doc = run(targets, max(args.repeat, 1), args.timeout_ms)
+
+    failed = 0
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            parser.error(f"no baseline at {args.baseline} (run with --save-baseline first)")
+        with open(args.baseline, encoding="utf-8") as f:
+            failed = compare(doc, json.load(f))
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    sys.exit(1 if failed else 0)
@@ -2,20 +2,237 @@
 Configuration and database connection setup
 """
 import os
+import threading
+import time
+from collections import deque
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _env_int(name, default):
+    """Read an integer setting from the environment"""
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+def _env_bool(name, default):
+    """Read a boolean setting from the environment"""
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+# Backend: "postgres" uses DATABASE_URL; "duckdb" runs an embedded database
+# built from the CSV dataset (see local_db.py)
+DB_BACKEND = os.getenv("DB_BACKEND", "postgres").strip().lower()
+DUCKDB_PATH = os.getenv("DUCKDB_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".local_db", "tubes_abd.duckdb")
+DATASET_DIR = os.getenv("DATASET_DIR") or os.path.join(PROJECT_ROOT, "resized_new")
+
+# Connection pool settings (see .env.example)
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)
+DB_KEEPALIVES_IDLE = _env_int("DB_KEEPALIVES_IDLE", 60)
+DB_KEEPALIVES_INTERVAL = _env_int("DB_KEEPALIVES_INTERVAL", 10)
+DB_KEEPALIVES_COUNT = _env_int("DB_KEEPALIVES_COUNT", 5)
+DB_STATEMENT_TIMEOUT_MS = _env_int("DB_STATEMENT_TIMEOUT_MS", 60000)
+# Parameterized load_query statements run as server-side prepared statements
+# (disable behind a transaction-mode pooler, which cannot keep them)
+DB_PREPARED_STATEMENTS = _env_bool("DB_PREPARED_STATEMENTS", True)
+DB_PREPARED_MAX = _env_int("DB_PREPARED_MAX", 256)
+
+# Panel queries a page may run at once; defaults to the steady pool size
+PREFETCH_WORKERS = _env_int("PREFETCH_WORKERS", DB_POOL_SIZE)
+
+# Persistent result cache on local disk (set RESULT_CACHE_MAX_MB=0 to disable)
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), ".query_cache")
+RESULT_CACHE_MAX_BYTES = _env_int("RESULT_CACHE_MAX_MB", 512) * 1024 * 1024
+RESULT_CACHE_TTL = _env_int("RESULT_CACHE_TTL", 86400)
+
+# Cached results are keyed by per-table change watermarks, polled at most
+# this often; the fallback TTL applies when watermarks cannot be read
+TABLE_VERSION_POLL_SECONDS = _env_int("TABLE_VERSION_POLL_SECONDS", 30)
+TABLE_VERSION_FALLBACK_TTL = _env_int("TABLE_VERSION_FALLBACK_TTL", 300)
+# Optional hard expiry for in-memory entries (0 = only on table change)
+QUERY_CACHE_TTL = _env_int("QUERY_CACHE_TTL", 0)
+QUERY_CACHE_MAX_ENTRIES = _env_int("QUERY_CACHE_MAX_ENTRIES", 1000)
+# Monthly trend series keep closed months and only re-aggregate from the
+# newest month on; closed months are rebuilt after this many seconds
+# (0 = only when a source table changes; their disk copy then expires
+# after RESULT_CACHE_TTL)
+SERIES_REBUILD_SECONDS = _env_int("SERIES_REBUILD_SECONDS", 0)
+
+# Background warm-up: re-runs the default-view queries of the WARMUP_PAGES
+# modules and of every page visited since startup, at startup and then every
+# interval; keys that expire on time are refilled this far ahead
+WARMUP_ENABLED = _env_bool("WARMUP_ENABLED", True)
+WARMUP_PAGES = [name.strip() for name in os.getenv("WARMUP_PAGES", "overview").split(",") if name.strip()]
+WARMUP_WORKERS = _env_int("WARMUP_WORKERS", 2)
+WARMUP_INTERVAL_SECONDS = _env_int("WARMUP_INTERVAL_SECONDS", TABLE_VERSION_POLL_SECONDS)
+WARMUP_LEAD_SECONDS = _env_int("WARMUP_LEAD_SECONDS", 2 * WARMUP_INTERVAL_SECONDS)
+
+# Query telemetry: in-process ring buffer, optionally mirrored to a JSONL file
+TELEMETRY_BUFFER_SIZE = _env_int("TELEMETRY_BUFFER_SIZE", 5000)
+TELEMETRY_LOG_PATH = os.getenv("TELEMETRY_LOG_PATH", "")
+
+# Data Explorer result streaming: rows per fetch and hard caps per result
+EXPLORER_PAGE_ROWS = _env_int("EXPLORER_PAGE_ROWS", 1000)
+EXPLORER_MAX_ROWS = _env_int("EXPLORER_MAX_ROWS", 100000)
+EXPLORER_MAX_BYTES = _env_int("EXPLORER_MAX_MB", 200) * 1024 * 1024
+# An open result cursor is closed after this long without a fetch
+EXPLORER_STREAM_IDLE_SECONDS = _env_int("EXPLORER_STREAM_IDLE_SECONDS", 120)
+# Default time budget for one SQL Editor statement (adjustable in the UI)
+EXPLORER_TIMEOUT_SECONDS = _env_int("EXPLORER_TIMEOUT_SECONDS", 30)
+
+# Plan viewer: DDL holding the intended indexes, and the table size above
+# which a sequential scan is flagged
+SCHEMA_DDL_PATH = os.getenv("SCHEMA_DDL_PATH") or os.path.join(PROJECT_ROOT, "supabase_ddl.sql")
+PLAN_SEQSCAN_MIN_ROWS = _env_int("PLAN_SEQSCAN_MIN_ROWS", 10000)
+
+# Exports re-run the query and stream it to a temp file this many rows at a time
+EXPORT_CHUNK_ROWS = _env_int("EXPORT_CHUNK_ROWS", 50000)
+EXPORT_DIR = os.getenv("EXPORT_DIR", "")
+# Export files left behind (e.g. by a crashed process) are deleted after this long
+EXPORT_MAX_AGE_SECONDS = _env_int("EXPORT_MAX_AGE_SECONDS", 3600)
+
+class PoolStats:
+    """Thread-safe counters describing how the connection pool is used"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connects = deque()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_connects = 0
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_connect(self):
+        now = time.monotonic()
+        with self._lock:
+            self.total_connects += 1
+            self._connects.append(now)
+            while self._connects and now - self._connects[0] > 60:
+                self._connects.popleft()
+
+    def connects_per_minute(self):
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for t in self._connects if now - t <= 60)
+
+POOL_STATS = PoolStats()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts blocked on a full pool"""
+
+    def connect(self):
+        # Only a checkout that finds every connection in use has to wait;
+        # the others are counted by the "checkout" event
+        saturated = DB_MAX_OVERFLOW >= 0 and self.checkedout() >= self.size() + DB_MAX_OVERFLOW
+        if not saturated:
+            return super().connect()
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            POOL_STATS.record_wait(time.perf_counter() - start)
+
+def _instrument(eng):
+    """Count new connections and checkouts through the public pool events"""
+    @event.listens_for(eng, "checkout")
+    def _on_checkout(dbapi_conn, connection_record, connection_proxy):
+        POOL_STATS.record_checkout()
+
+    return eng
 
 def get_engine(url):
-    """Create SQLAlchemy engine with proper SSL configuration"""
+    """Create SQLAlchemy engine with SSL, keepalive and pool configuration"""
     if not url:
         return None
-    return create_engine(url, connect_args={"sslmode": "require"})
+    connect_args = {
+        "sslmode": "require",
+        "keepalives": 1,
+        "keepalives_idle": DB_KEEPALIVES_IDLE,
+        "keepalives_interval": DB_KEEPALIVES_INTERVAL,
+        "keepalives_count": DB_KEEPALIVES_COUNT,
+    }
+    eng = create_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+
+    @event.listens_for(eng, "connect")
+    def _on_connect(dbapi_conn, connection_record):
+        POOL_STATS.record_connect()
+        if DB_STATEMENT_TIMEOUT_MS > 0:
+            cursor = dbapi_conn.cursor()
+            cursor.execute(f"SET statement_timeout = {int(DB_STATEMENT_TIMEOUT_MS)}")
+            cursor.close()
+            dbapi_conn.commit()
 
-engine = get_engine(DATABASE_URL)
+    return _instrument(eng)
+
+def get_local_engine(path, dataset_dir=None):
+    """Create an engine over the embedded DuckDB file, building it if needed"""
+    import local_db
+
+    local_db.ensure_database(path, dataset_dir or DATASET_DIR, SCHEMA_DDL_PATH)
+    eng = create_engine(
+        f"duckdb:///{path}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+
+    @event.listens_for(eng, "connect")
+    def _on_connect(dbapi_conn, connection_record):
+        POOL_STATS.record_connect()
+
+    return _instrument(eng)
+
+engine = get_local_engine(DUCKDB_PATH) if DB_BACKEND == "duckdb" else get_engine(DATABASE_URL)
+
+def get_pool_stats():
+    """Snapshot of live pool counters for sizing and monitoring"""
+    if engine is None:
+        return {}
+    pool = engine.pool
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checkouts": POOL_STATS.checkouts,
+        "waits": POOL_STATS.waits,
+        "avg_wait_ms": POOL_STATS.wait_seconds / POOL_STATS.waits * 1000 if POOL_STATS.waits else 0.0,
+        "max_wait_ms": POOL_STATS.max_wait_seconds * 1000,
+        "total_connects": POOL_STATS.total_connects,
+        "connects_per_minute": POOL_STATS.connects_per_minute(),
+    }
 
 # App configuration
 APP_TITLE = "E-Commerce Analytics Dashboard"
@@ -62,3 +279,12 @@ TABLES = [
     "customer_address", "shipping", "product", "order", 
     "order_items", "product_review", "stock"
 ]
+
+# Primary key of each table (keyset pagination in Quick Table View)
+PRIMARY_KEYS = {
+    "country": "country_id", "store": "store_id", "category": "category_id",
+    "brand": "brand_id", "customer": "customer_id",
+    "customer_address": "customer_address_id", "shipping": "shipping_id",
+    "product": "product_id", "order": "order_id", "order_items": "order_items_id",
+    "product_review": "review_id", "stock": "stock_id"
+}
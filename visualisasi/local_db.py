@@ -0,0 +1,149 @@
+"""
+Embedded DuckDB database built from the CSV dataset and supabase_ddl.sql
+Usage: python local_db.py [--rebuild]
+"""
+import argparse
+import glob
+import hashlib
+import os
+import re
+import time
+
+# Written by build_database: what the file was built from, and a change
+# counter per table that app writes bump (see utils.table_versions)
+BUILD_TABLE = "_local_db_build"
+VERSIONS_TABLE = "_table_versions"
+
+def _ddl_statements(ddl_path):
+    """
+    CREATE TABLE statements from the Supabase DDL, adapted for DuckDB:
+    SERIAL becomes INTEGER and foreign keys are dropped (DuckDB cannot update
+    rows referenced by a foreign key). Secondary indexes are skipped because
+    columnar scans do not use them.
+    """
+    with open(ddl_path, encoding="utf-8") as f:
+        ddl = re.sub(r'--[^\n]*', '', f.read())
+    statements = []
+    for statement in ddl.split(';'):
+        statement = statement.strip()
+        if not re.match(r'CREATE\s+TABLE', statement, re.IGNORECASE):
+            continue
+        statement = re.sub(r'\bSERIAL\b', 'INTEGER', statement, flags=re.IGNORECASE)
+        statement = re.sub(r',\s*CONSTRAINT\s+\w+\s+FOREIGN\s+KEY[^,]*?REFERENCES\s+"?\w+"?\s*\([^)]*\)', '', statement,
+                           flags=re.IGNORECASE)
+        statements.append(statement)
+    return statements
+
+def _table_name(statement):
+    return re.match(r'CREATE\s+TABLE\s+"?(\w+)"?', statement, re.IGNORECASE).group(1)
+
+def _csv_paths(dataset_dir, table):
+    """<table>.csv, or the shards in <table>/*.csv"""
+    path = os.path.join(dataset_dir, f"{table}.csv")
+    if os.path.exists(path):
+        return [path]
+    return sorted(glob.glob(os.path.join(dataset_dir, table, "*.csv")))
+
+def _ddl_hash(ddl_path):
+    with open(ddl_path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def build_info(db_path):
+    """(dataset dir, DDL hash, build id) recorded in the database, or None"""
+    import duckdb
+
+    try:
+        con = duckdb.connect(db_path, read_only=True)
+    except Exception:
+        return None
+    try:
+        # A file built before the version counters existed has no such table
+        con.execute(f"SELECT COUNT(*) FROM {VERSIONS_TABLE}")
+        return con.execute(f"SELECT dataset_dir, ddl_hash, build_id FROM {BUILD_TABLE}").fetchone()
+    except Exception:
+        return None
+    finally:
+        con.close()
+
+def is_stale(db_path, dataset_dir, ddl_path):
+    """
+    True when the database is missing, was built from another dataset
+    directory or DDL, or is older than any CSV or the DDL
+    """
+    if not os.path.exists(db_path):
+        return True
+    info = build_info(db_path)
+    if info is None or info[0] != os.path.abspath(dataset_dir) or info[1] != _ddl_hash(ddl_path):
+        return True
+    built = os.path.getmtime(db_path)
+    sources = glob.glob(os.path.join(dataset_dir, "*.csv")) + glob.glob(os.path.join(dataset_dir, "*", "*.csv")) + [ddl_path]
+    return any(os.path.getmtime(p) > built for p in sources if os.path.exists(p))
+
+def build_database(db_path, dataset_dir, ddl_path, verbose=False):
+    """Create every table and bulk-load its CSV; the file is swapped in atomically"""
+    import duckdb
+
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    tmp_path = db_path + ".building"
+    for leftover in (tmp_path, tmp_path + ".wal"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+    con = duckdb.connect(tmp_path)
+    try:
+        con.execute(f"CREATE TABLE {VERSIONS_TABLE} (table_name VARCHAR PRIMARY KEY, version BIGINT NOT NULL)")
+        for statement in _ddl_statements(ddl_path):
+            table = _table_name(statement)
+            con.execute(statement)
+            con.execute(f"INSERT INTO {VERSIONS_TABLE} VALUES (?, 0)", [table])
+            csv_paths = _csv_paths(dataset_dir, table)
+            if not csv_paths:
+                if verbose:
+                    print(f"  {table}: no CSV, left empty")
+                continue
+            start = time.perf_counter()
+            con.execute(f'INSERT INTO "{table}" BY NAME SELECT * FROM read_csv(?, header = true)', [csv_paths])
+            rows = con.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+            if verbose:
+                print(f"  {table}: {rows:,} rows in {time.perf_counter() - start:.2f}s")
+        con.execute(f"CREATE TABLE {BUILD_TABLE} (dataset_dir VARCHAR, ddl_hash VARCHAR, build_id VARCHAR)")
+        con.execute(f"INSERT INTO {BUILD_TABLE} VALUES (?, ?, ?)",
+                    [os.path.abspath(dataset_dir), _ddl_hash(ddl_path), f"{time.time():.6f}"])
+        con.execute("CHECKPOINT")
+    finally:
+        con.close()
+    os.replace(tmp_path, db_path)
+    return db_path
+
+def ensure_database(db_path, dataset_dir, ddl_path):
+    """Build the local database on first use or when the dataset changed"""
+    if is_stale(db_path, dataset_dir, ddl_path):
+        build_database(db_path, dataset_dir, ddl_path)
+    return db_path
+
+def table_counts(db_path):
+    """Row count per table, for a quick sanity check of a build"""
+    import duckdb
+
+    con = duckdb.connect(db_path, read_only=True)
+    try:
+        tables = [row[0] for row in con.execute("SELECT table_name FROM duckdb_tables() ORDER BY table_name").fetchall()
+                  if not row[0].startswith("_")]
+        return {t: con.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in tables}
+    finally:
+        con.close()
+
+if __name__ == "__main__":
+    from config import DUCKDB_PATH, DATASET_DIR, SCHEMA_DDL_PATH
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rebuild", action="store_true", help="rebuild even if the database is up to date")
+    args = parser.parse_args()
+
+    if args.rebuild or is_stale(DUCKDB_PATH, DATASET_DIR, SCHEMA_DDL_PATH):
+        print(f"Building {DUCKDB_PATH} from {DATASET_DIR}")
+        build_database(DUCKDB_PATH, DATASET_DIR, SCHEMA_DDL_PATH, verbose=True)
+    else:
+        print(f"{DUCKDB_PATH} is up to date")
+        for table, rows in table_counts(DUCKDB_PATH).items():
+            print(f"  {table}: {rows:,} rows")
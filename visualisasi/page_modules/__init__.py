@@ -1,22 +1,38 @@
-"""Page modules package initialization - imports all page modules"""
-from . import overview
-from . import customer
-from . import product
-from . import order
-from . import shipping
-from . import review
-from . import store_brand
-from . import stock
-from . import data_explorer
+"""Page modules package - registry of dashboard pages, each imported on first use"""
+import importlib
+import sys
 
-__all__ = [
-    'overview',
-    'customer',
-    'product',
-    'order',
-    'shipping',
-    'review',
-    'store_brand',
-    'stock',
-    'data_explorer'
+# Sidebar order; app.py renders each page's heading from 'icon' (a Material
+# icon) and 'heading' (default: the title), and 'filtered' pages show the
+# global filter bar (utils.filters)
+PAGES = [
+    {'title': 'Overview Dashboard', 'icon': 'dashboard', 'module': 'overview', 'filtered': True},
+    {'title': 'Customer Analytics', 'icon': 'people', 'module': 'customer', 'filtered': True},
+    {'title': 'Product Analytics', 'icon': 'inventory', 'module': 'product', 'filtered': True},
+    {'title': 'Order Analytics', 'icon': 'shopping_bag', 'module': 'order', 'filtered': True},
+    {'title': 'Shipping Analytics', 'icon': 'local_shipping', 'module': 'shipping', 'filtered': True},
+    {'title': 'Review Analytics', 'icon': 'star_rate', 'module': 'review', 'filtered': True},
+    {'title': 'Store & Brand Analytics', 'icon': 'analytics', 'module': 'store_brand', 'filtered': True},
+    {'title': 'Stock Movement', 'icon': 'move_to_inbox', 'module': 'stock', 'filtered': True,
+     'heading': 'Stock Movement Analytics'},
+    {'title': 'Data Explorer', 'icon': 'search', 'module': 'data_explorer', 'filtered': False},
+    {'title': 'Performance', 'icon': 'speed', 'module': 'performance', 'filtered': False},
 ]
+
+PAGES_BY_TITLE = {page['title']: page for page in PAGES}
+
+__all__ = [page['module'] for page in PAGES]
+
+def load(page):
+    """Module of a registry entry; imported (and cached in sys.modules) on first call"""
+    return importlib.import_module(f"{__name__}.{page['module']}")
+
+def is_loaded(page):
+    """Whether a registry entry's module has been imported (its page was rendered)"""
+    return f"{__name__}.{page['module']}" in sys.modules
+
+def __getattr__(name):
+    # Keeps `page_modules.overview` working without importing every page up front
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,20 +1,64 @@
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-from utils.database import load_query
+from utils.database import load_kpis, load_series, prefetch
+
+KPIS = {
+    'customer': {
+        'total_customers': 'COUNT(*)',
+        'countries': 'COUNT(DISTINCT country_id)',
+    },
+    'customer_address': {'with_address': 'COUNT(DISTINCT customer_id)'},
+}
+
+QUERIES = {
+    'top_countries': '''
+        SELECT co.name as country, COUNT(c.customer_id) as total_customers
+        FROM customer c
+        JOIN country co ON c.country_id = co.country_id
+        {where:customer c}
+        GROUP BY co.name
+        ORDER BY total_customers DESC
+        LIMIT 15
+        ''',
+    'gender': '''
+        SELECT gender, COUNT(*) as count
+        FROM customer
+        WHERE gender IS NOT NULL {and:customer}
+        GROUP BY gender
+        ''',
+    'top_spenders': '''
+    SELECT c.customer_id, c.name, c.email, co.name as country,
+           COUNT(o.order_id) as total_orders,
+           SUM(o.total_amount) as total_spent
+    FROM customer c
+    JOIN "order" o ON c.customer_id = o.customer_id
+    JOIN country co ON c.country_id = co.country_id
+    {where:order o}
+    GROUP BY c.customer_id, c.name, c.email, co.name
+    ORDER BY total_spent DESC
+    LIMIT 10
+    ''',
+}
+
+def tasks():
+    """Every query this page needs, keyed by panel"""
+    return {
+        'kpis': lambda: load_kpis(KPIS),
+        'signups': lambda: load_series('customer', 'signup_date', {'signups': 'COUNT(*)'}),
+        **QUERIES,
+    }
 
 def render():
-    st.markdown('<div class="icon-title"><span class="material-icons">people</span><h2 style="display:inline;">Customer Analytics</h2></div>', unsafe_allow_html=True)
+    data = prefetch(tasks())
     
     col1, col2, col3 = st.columns(3)
     
-    total_customers = load_query("SELECT COUNT(*) FROM customer").iloc[0,0]
-    countries = load_query("SELECT COUNT(DISTINCT country_id) FROM customer").iloc[0,0]
-    with_address = load_query("SELECT COUNT(DISTINCT customer_id) FROM customer_address").iloc[0,0]
+    kpis = data['kpis']
     
-    col1.metric("Total Customers", f"{int(total_customers):,}")
-    col2.metric("Countries Covered", f"{int(countries):,}")
-    col3.metric("Customers with Address", f"{int(with_address):,}")
+    col1.metric("Total Customers", f"{int(kpis['total_customers'] or 0):,}")
+    col2.metric("Countries Covered", f"{int(kpis['countries'] or 0):,}")
+    col3.metric("Customers with Address", f"{int(kpis['with_address'] or 0):,}")
     
     st.divider()
     
@@ -22,15 +66,7 @@ def render():
     
     with col1:
         st.markdown('<div class="icon-title"><span class="material-icons">public</span><h3 style="display:inline;">Top 15 Countries by Customers</h3></div>', unsafe_allow_html=True)
-        q = '''
-        SELECT co.name as country, COUNT(c.customer_id) as total_customers
-        FROM customer c
-        JOIN country co ON c.country_id = co.country_id
-        GROUP BY co.name
-        ORDER BY total_customers DESC
-        LIMIT 15
-        '''
-        df = load_query(q)
+        df = data['top_countries']
         if not df.empty:
             fig = px.bar(df, x='total_customers', y='country', orientation='h',
                         color='total_customers', color_continuous_scale='Blues')
@@ -39,44 +75,20 @@ def render():
     
     with col2:
         st.markdown('<div class="icon-title"><span class="material-icons">wc</span><h3 style="display:inline;">Gender Distribution</h3></div>', unsafe_allow_html=True)
-        q = '''
-        SELECT gender, COUNT(*) as count
-        FROM customer
-        WHERE gender IS NOT NULL
-        GROUP BY gender
-        '''
-        df = load_query(q)
+        df = data['gender']
         if not df.empty:
             fig = px.pie(df, values='count', names='gender', hole=0.4)
             fig.update_layout(height=400)
             st.plotly_chart(fig, use_container_width=True)
         
         st.markdown('<div class="icon-title"><span class="material-icons">event</span><h3 style="display:inline;">Customer Signups Over Time</h3></div>', unsafe_allow_html=True)
-        q = '''
-        SELECT DATE_TRUNC('month', signup_date) as month, COUNT(*) as signups
-        FROM customer
-        WHERE signup_date IS NOT NULL
-        GROUP BY DATE_TRUNC('month', signup_date)
-        ORDER BY month
-        '''
-        df = load_query(q)
+        df = data['signups']
         if not df.empty:
             fig = px.area(df, x='month', y='signups', title="Monthly Signups")
             fig.update_layout(height=300)
             st.plotly_chart(fig, use_container_width=True)
     
     st.markdown('<div class="icon-title"><span class="material-icons">emoji_events</span><h3 style="display:inline;">Top 10 Customers by Total Spending</h3></div>', unsafe_allow_html=True)
-    q = '''
-    SELECT c.customer_id, c.name, c.email, co.name as country,
-           COUNT(o.order_id) as total_orders,
-           SUM(o.total_amount) as total_spent
-    FROM customer c
-    JOIN "order" o ON c.customer_id = o.customer_id
-    JOIN country co ON c.country_id = co.country_id
-    GROUP BY c.customer_id, c.name, c.email, co.name
-    ORDER BY total_spent DESC
-    LIMIT 10
-    '''
-    df = load_query(q)
+    df = data['top_spenders']
     if not df.empty:
         st.dataframe(df, use_container_width=True)
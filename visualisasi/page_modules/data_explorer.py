@@ -1,80 +1,31 @@
 """
 Data Explorer page - Advanced SQL query editor with validation
 """
+import os
+from functools import partial
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import pandas as pd
+import plotly.express as px
+import time
 from datetime import datetime
-from config import TABLES
+from config import TABLES, PRIMARY_KEYS, EXPLORER_TIMEOUT_SECONDS
 from utils import load_query, validate_sql_query, format_sql, execute_query_safe
+from utils.database import keyset_query, estimated_rows
+from utils.export import FORMATS, export_query, read as read_export, remove as remove_export
+from utils.plan import explain
+from utils.query_control import QueryJob
+from utils.streaming import open_stream
 
-def render():
-    """Render Data Explorer page"""
-    st.markdown('<div class="icon-title"><span class="material-icons">search</span><h2 style="display:inline;">Data Explorer</h2></div>', unsafe_allow_html=True)
-    
-    # Initialize session state for query history
-    if 'query_history' not in st.session_state:
-        st.session_state.query_history = []
-    
-    # Tabs for different modes
-    tab1, tab2, tab3 = st.tabs([
-        "Quick Table View",
-        "Advanced SQL Editor", 
-        "Query History"
-    ])
-    
-    # ========================================
-    # TAB 1: Quick Table View
-    # ========================================
-    with tab1:
-        st.markdown('<div class="icon-title"><span class="material-icons">table_chart</span><h3 style="display:inline;">Quick Table Preview</h3></div>', unsafe_allow_html=True)
-        
-        tables = TABLES + ['"order"']  # Add order with quotes for SQL
-        
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            selected_table = st.selectbox("Select Table", tables, key="quick_table")
-        with col2:
-            limit = st.slider("Limit rows", 10, 1000, 100, key="quick_limit")
-        
-        if st.button("Load Table", key="load_quick"):
-            table_name = selected_table
-            q = f"SELECT * FROM {table_name} LIMIT {limit}"
-            df = load_query(q)
-            
-            if not df.empty:
-                st.markdown(f"#### Preview: `{selected_table.replace('\"', '')}`")
-                st.dataframe(df, use_container_width=True)
-                
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Rows Shown", len(df))
-                with col2:
-                    total = load_query(f"SELECT COUNT(*) FROM {table_name}").iloc[0,0]
-                    st.metric("Total Rows", f"{int(total):,}")
-                with col3:
-                    st.metric("Columns", len(df.columns))
-                
-                # Download options
-                csv = df.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="Download CSV",
-                    data=csv,
-                    file_name=f"{selected_table.replace('\"', '')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    key="download_quick"
-                )
-    
-    # ========================================
-    # TAB 2: Advanced SQL Editor
-    # ========================================
-    with tab2:
-        st.markdown('<div class="icon-title"><span class="material-icons">code</span><h3 style="display:inline;">Advanced SQL Query Editor</h3></div>', unsafe_allow_html=True)
-        st.caption("⚡ Supports complex queries: JOINs, CTEs, subqueries, window functions, aggregations, and more")
-        
-        # Example queries dropdown
-        example_queries = {
-            "Simple SELECT": "SELECT * FROM customer LIMIT 10",
-            "JOIN Multiple Tables": """SELECT 
+WRITE_TYPES = ['INSERT', 'UPDATE', 'DELETE']
+TIMEOUT_OPTIONS = sorted({5, 15, 30, 60, 120, 300, 600, EXPLORER_TIMEOUT_SECONDS})
+JOB_POLL_SECONDS = 0.5
+STATUS_LABELS = {'timeout': '⏱ TIMED OUT', 'cancelled': 'CANCELLED', 'error': '❌ FAILED'}
+
+# Example queries for the SQL editor (also run by benchmark.py)
+EXAMPLE_QUERIES = {
+    "Simple SELECT": "SELECT * FROM customer LIMIT 10",
+    "JOIN Multiple Tables": """SELECT 
     c.name AS customer_name,
     co.name AS country,
     COUNT(o.order_id) AS total_orders,
@@ -85,7 +36,7 @@ LEFT JOIN "order" o ON c.customer_id = o.customer_id
 GROUP BY c.name, co.name
 ORDER BY total_spent DESC
 LIMIT 20""",
-            "Complex Aggregation with CASE": """SELECT 
+    "Complex Aggregation with CASE": """SELECT 
     c.name AS category,
     COUNT(DISTINCT p.product_id) AS total_products,
     AVG(p.price) AS avg_price,
@@ -95,7 +46,7 @@ FROM product p
 JOIN category c ON p.category_id = c.category_id
 GROUP BY c.name
 ORDER BY total_products DESC""",
-            "CTE (Common Table Expression)": """WITH monthly_sales AS (
+    "CTE (Common Table Expression)": """WITH monthly_sales AS (
     SELECT 
         DATE_TRUNC('month', order_date) AS month,
         SUM(total_amount) AS revenue,
@@ -112,7 +63,7 @@ SELECT
     revenue - LAG(revenue) OVER (ORDER BY month) AS revenue_change
 FROM monthly_sales
 ORDER BY month DESC""",
-            "Subquery with Window Function": """SELECT 
+    "Subquery with Window Function": """SELECT 
     p.name AS product,
     c.name AS category,
     p.price,
@@ -123,7 +74,7 @@ FROM product p
 JOIN category c ON p.category_id = c.category_id
 WHERE p.price > (SELECT AVG(price) FROM product)
 ORDER BY c.name, price_rank_in_category""",
-            "Top Customers by Category": """SELECT 
+    "Top Customers by Category": """SELECT 
     c.name AS customer,
     cat.name AS category,
     SUM(oi.quantity) AS items_bought,
@@ -137,7 +88,7 @@ GROUP BY c.name, cat.name
 HAVING SUM(oi.quantity * oi.unit_price) > 1000
 ORDER BY spent DESC
 LIMIT 50""",
-            "Reviews with Product Details": """SELECT 
+    "Reviews with Product Details": """SELECT 
     pr.review_id,
     p.name AS product,
     c.name AS category,
@@ -153,133 +104,528 @@ JOIN brand b ON p.brand_id = b.brand_id
 WHERE pr.rating >= 4
 ORDER BY pr.review_date DESC
 LIMIT 100"""
-        }
+}
+
+def _add_history(query, query_type, rows, execution_time, status='ok', timeout_ms=None):
+    """Prepend a query to the session history (last 50 kept)"""
+    entry = {
+        'query': query,
+        'timestamp': datetime.now(),
+        'rows': rows,
+        'execution_time': execution_time,
+        'type': query_type,
+        'status': status,
+        'timeout_ms': timeout_ms
+    }
+    st.session_state.query_history.insert(0, entry)
+    
+    # Keep only last 50 queries
+    if len(st.session_state.query_history) > 50:
+        st.session_state.query_history = st.session_state.query_history[:50]
+    return entry
+
+def _close_stream():
+    """Release the cursor held by the previous SELECT, if any"""
+    stream = st.session_state.pop('sql_stream', None)
+    st.session_state.pop('sql_stream_entry', None)
+    if stream is not None:
+        stream.close()
+
+def _start_job(query, query_type, timeout_ms):
+    """Run the statement on a worker thread so it can be polled and cancelled"""
+    running = st.session_state.pop('sql_job', None)
+    if running is not None:
+        running['job'].cancel()
+    _close_stream()
+    st.session_state.pop('sql_outcome', None)
+    
+    if query_type in WRITE_TYPES:
+        job = QueryJob(lambda job: execute_query_safe(query, timeout_ms=timeout_ms, job=job))
+    else:
+        # Stream SELECTs: only the first page is fetched up front
+        job = QueryJob(lambda job: open_stream(query, timeout_ms=timeout_ms, job=job))
+    st.session_state.sql_job = {
+        'job': job.start(),
+        'query': query,
+        'type': query_type,
+        'timeout_ms': timeout_ms
+    }
+
+def _rerun_fragment():
+    """Rerun only the calling fragment; a full-app run cannot, so it reruns the app"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+def _submit(query=None):
+    """
+    Validate ``query`` (default: the editor text) and start it; used by the
+    editor Run and history Re-run buttons. Writes wait for confirmation in
+    the editor. Only the editor and result fragments rerun.
+    """
+    if query is None:
+        query = st.session_state.sql_input
+    if not query:
+        return
+    is_safe, query_type, warning = validate_sql_query(query)
+    if not is_safe:
+        st.session_state.sql_notice = ('error', warning or "Query blocked for safety")
+    elif warning:
+        st.session_state.sql_pending_write = {'query': query, 'type': query_type, 'warning': warning}
+    else:
+        _start_job(query, query_type, st.session_state.sql_timeout * 1000)
+    st.rerun(["sql_editor", "sql_results"])
+
+def _confirm_write():
+    pending = st.session_state.pop('sql_pending_write', None)
+    if pending is not None:
+        _start_job(pending['query'], pending['type'], st.session_state.sql_timeout * 1000)
+    st.rerun(["sql_editor", "sql_results"])
+
+def _poll_job():
+    """Show the running statement with a Cancel button; store its outcome once done"""
+    info = st.session_state.get('sql_job')
+    if info is None:
+        return
+    job = info['job']
+    
+    if not job.done:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.info(f"Executing query... {job.elapsed:.1f}s elapsed (budget {info['timeout_ms'] // 1000}s)")
+        with col2:
+            if st.button("Cancel", key="cancel_sql", disabled=job.cancel_requested):
+                job.cancel()
+        time.sleep(JOB_POLL_SECONDS)
+        _rerun_fragment()
+    
+    st.session_state.pop('sql_job', None)
+    status = job.status
+    outcome = {'status': status, 'type': info['type'], 'seconds': job.elapsed, 'timeout_ms': info['timeout_ms']}
+    if status != 'ok':
+        _add_history(info['query'], info['type'], 0, job.elapsed, status, info['timeout_ms'])
+        outcome['error'] = job.error
+    elif info['type'] in WRITE_TYPES:
+        result = job.value
+        _add_history(info['query'], info['type'], len(result), job.elapsed, status, info['timeout_ms'])
+        outcome['affected_rows'] = int(result['affected_rows'].iloc[0])
+    else:
+        stream = job.value
+        entry = _add_history(info['query'], info['type'], stream.rows, stream.first_page_seconds, status, info['timeout_ms'])
+        st.session_state.sql_stream = stream
+        st.session_state.sql_stream_entry = entry
+    st.session_state.sql_outcome = outcome
+    # The history fragment only sees the new entry on an app rerun
+    st.rerun()
+
+def _render_outcome():
+    """Status of the last finished statement (SELECT rows are shown by _render_stream)"""
+    outcome = st.session_state.get('sql_outcome')
+    if outcome is None:
+        return
+    status = outcome['status']
+    if status == 'timeout':
+        st.error(f"⏱ Query stopped: it exceeded the {outcome['timeout_ms'] // 1000}s time budget")
+    elif status == 'cancelled':
+        st.warning(f"Query cancelled after {outcome['seconds']:.1f}s")
+    elif status != 'ok':
+        st.error(outcome['error'])
+    elif outcome['type'] in WRITE_TYPES:
+        st.success(f"✓ Query executed successfully in {outcome['seconds']:.3f}s")
         
-        selected_example = st.selectbox(
-            "Load Example Query",
-            ["-- Select an example --"] + list(example_queries.keys()),
-            key="example_selector"
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Affected Rows", outcome['affected_rows'])
+        with col2:
+            st.metric("Execution Time", f"{outcome['seconds']:.3f}s")
+
+def _export_controls(query, key, base_name):
+    """Stream the full result of ``query`` to a compressed file and offer it for download"""
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        fmt = st.selectbox("Export format", list(FORMATS), key=f"{key}_export_format")
+    with col2:
+        prepare = st.button("Prepare Export", key=f"{key}_export_prepare")
+    
+    state_key = f"{key}_export"
+    previous = st.session_state.get(state_key)
+    if previous is not None and (prepare or previous['query'] != query):
+        # A new export, or one for another query, replaces the stored file
+        del st.session_state[state_key]
+        remove_export(previous['path'])
+    if prepare:
+        progress = st.empty()
+        info, error = export_query(
+            query, fmt,
+            progress=lambda rows: progress.caption(f"Exporting... {rows:,} rows written")
         )
-        
-        if st.button("Load Example", key="load_example"):
-            if selected_example != "-- Select an example --":
-                st.session_state.custom_query = example_queries[selected_example]
-                st.rerun()
-        
-        # SQL Query Input
-        if 'custom_query' not in st.session_state:
-            st.session_state.custom_query = "SELECT * FROM customer LIMIT 10"
-        
-        custom_query = st.text_area(
-            "SQL Query",
-            value=st.session_state.custom_query,
-            height=250,
-            help="Enter any SQL query. Complex queries with JOINs, CTEs, subqueries are supported.",
-            key="sql_input"
+        progress.empty()
+        if error:
+            st.error(error)
+        else:
+            st.session_state[state_key] = dict(info, query=query)
+    
+    info = st.session_state.get(state_key)
+    if info is None or not os.path.exists(info['path']):
+        return
+    st.caption(f"{info['rows']:,} rows, {info['bytes'] / 1024 / 1024:,.2f} MB written in {info['seconds']:.1f}s")
+    # The file is read only when the button is clicked
+    st.download_button(
+        label=f"Download {info['format']}",
+        data=partial(read_export, info['path']),
+        file_name=f"{base_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{info['extension']}",
+        mime=info['mime'],
+        key=f"{key}_download"
+    )
+
+def _render_stream():
+    """Show the rows fetched so far for the current SELECT"""
+    stream = st.session_state.get('sql_stream')
+    if stream is None:
+        return
+    
+    if stream.is_open and st.button(f"Fetch next {stream.page_rows:,} rows", key="fetch_more"):
+        try:
+            stream.fetch_next()
+        except Exception as e:
+            # A FETCH can hit the time budget too; keep the rows already shown
+            stream.close()
+            st.error(f"❌ Error: {str(e)}")
+        entry = st.session_state.get('sql_stream_entry')
+        if entry is not None:
+            entry['rows'] = stream.rows
+    
+    st.success(f"✓ First {min(stream.rows, stream.page_rows):,} rows in {stream.first_page_seconds:.3f}s")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Rows Fetched", f"{stream.rows:,}")
+    with col2:
+        st.metric("Columns", len(stream.columns))
+    with col3:
+        st.metric("Result Size", f"{stream.bytes / 1024:,.0f} KB")
+    
+    if stream.truncated:
+        st.warning(
+            f"Stopped at the result cap ({stream.max_rows:,} rows / {stream.max_bytes // (1024 * 1024):,} MB). "
+            "Add a LIMIT or a WHERE clause to narrow the result."
         )
+    elif stream.expired:
+        st.caption(f"The result cursor was closed after {stream.idle_seconds}s without a fetch; run the query again for more rows")
+    elif stream.is_open:
+        st.caption("More rows are available on the server")
+    
+    result = stream.frame()
+    if not result.empty:
+        st.dataframe(result, use_container_width=True, height=400)
         
-        # Update session state
-        st.session_state.custom_query = custom_query
-        
-        # Query controls
-        col1, col2, col3, col4 = st.columns([2, 2, 2, 2])
-        
+        # Exports re-run the query, so they are not limited to the fetched rows
+        _export_controls(stream.query, "result", "query_result")
+    else:
+        st.info("Query executed but returned no rows")
+
+def _render_plan(plan):
+    """Show an EXPLAIN result as an indented node table with index hints"""
+    nodes = plan['nodes']
+    if plan['analyzed']:
+        hit = nodes['shared_hit'].fillna(0).iloc[0] if not nodes.empty else 0
+        read = nodes['shared_read'].fillna(0).iloc[0] if not nodes.empty else 0
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            run_query = st.button("Run Query", type="primary", key="run_sql")
+            st.metric("Planning Time", f"{plan['planning_ms']:.2f} ms")
         with col2:
-            format_query = st.button("Format SQL", key="format_sql")
+            st.metric("Execution Time", f"{plan['execution_ms']:.2f} ms")
         with col3:
-            validate_only = st.button("Validate", key="validate_sql")
+            st.metric("Shared Buffers Hit / Read", f"{int(hit):,} / {int(read):,}")
         with col4:
-            clear_query = st.button("Clear", key="clear_sql")
-        
-        # Format SQL
-        if format_query:
-            try:
-                formatted = format_sql(custom_query)
-                st.session_state.custom_query = formatted
-                st.success("✓ Query formatted!")
-                st.rerun()
-            except Exception as e:
-                st.error(f"Could not format query: {e}")
+            st.metric("Cache Hit Ratio", f"{hit / (hit + read):.1%}" if hit + read else "-")
+    else:
+        st.info(f"{plan['query_type']} was only planned (EXPLAIN without ANALYZE); nothing was executed or modified.")
+    
+    for hint in plan['hints']:
+        st.warning(hint)
+    
+    if plan['analyzed']:
+        columns = ['node', 'self_ms', 'total_ms', 'loops', 'est_rows', 'actual_rows', 'misestimate_x',
+                   'shared_hit', 'shared_read', 'rows_removed', 'filter']
+    else:
+        columns = ['node', 'cost', 'est_rows', 'filter']
+    st.dataframe(nodes[columns], use_container_width=True, hide_index=True)
+    
+    if plan['analyzed'] and nodes['self_ms'].notna().any():
+        fig = px.bar(nodes, x='self_ms', y='node', orientation='h', title="Time Spent per Plan Node (ms, exclusive)")
+        fig.update_layout(height=max(250, 40 * len(nodes)), yaxis={'autorange': 'reversed'})
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with st.expander("Raw EXPLAIN JSON"):
+        st.json(plan['raw'])
+
+@st.fragment
+def _quick_table():
+    """Keyset-paged table preview; paging reruns only this fragment"""
+    st.markdown('<div class="icon-title"><span class="material-icons">table_chart</span><h3 style="display:inline;">Quick Table Preview</h3></div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        table = st.selectbox("Select Table", TABLES, key="quick_table")
+    with col2:
+        page_size = st.select_slider("Rows per page", [10, 25, 50, 100, 250, 500, 1000], value=100, key="quick_page_size")
+    
+    table_sql = f'"{table}"'
+    key = PRIMARY_KEYS[table]
+    
+    # Reset paging when the table or page size changes
+    view = st.session_state.get('quick_view')
+    if view is None or view['table'] != table or view['page_size'] != page_size:
+        view = {'table': table, 'page_size': page_size, 'direction': 'first', 'value': None, 'page_no': 1}
+        st.session_state.quick_view = view
+    
+    df = load_query(keyset_query(table_sql, key, page_size, view['direction'], view['value']))
+    estimate = estimated_rows(table_sql)
+    
+    # Navigation
+    col1, col2, col3, col4, col5, col6 = st.columns([1, 1, 1, 1, 2, 1])
+    first_key = df[key].iloc[0] if not df.empty else None
+    last_key = df[key].iloc[-1] if not df.empty else None
+    with col1:
+        go_first = st.button("⏮ First", key="quick_first")
+    with col2:
+        go_prev = st.button("◀ Prev", key="quick_prev", disabled=first_key is None or view['page_no'] == 1)
+    with col3:
+        go_next = st.button("Next ▶", key="quick_next", disabled=last_key is None or len(df) < page_size)
+    with col4:
+        go_last = st.button("Last ⏭", key="quick_last")
+    with col5:
+        jump_to = st.number_input(f"Jump to {key}", min_value=0, step=1, value=None, key="quick_jump_key")
+    with col6:
+        go_jump = st.button("Go", key="quick_jump", disabled=jump_to is None)
+    
+    moves = [
+        (go_first, 'first', None, 1),
+        (go_prev, 'before', first_key, view['page_no'] - 1 if view['page_no'] else None),
+        (go_next, 'after', last_key, view['page_no'] + 1 if view['page_no'] else None),
+        (go_last, 'last', None, -(-estimate // page_size) if estimate else None),
+        (go_jump, 'from', jump_to, None),
+    ]
+    for clicked, direction, value, page_no in moves:
+        if clicked:
+            view.update(direction=direction, value=value, page_no=page_no)
+            _rerun_fragment()
+    
+    if df.empty:
+        st.info(f"No rows in `{table}` for this page")
+    else:
+        st.markdown(f"#### Preview: `{table}` ({key} {first_key} – {last_key})")
+        st.dataframe(df, use_container_width=True, hide_index=True)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        pages = f" of ~{-(-estimate // page_size):,}" if estimate else ""
+        st.metric("Page", f"{view['page_no']:,}{pages}" if view['page_no'] else "—")
+    with col2:
+        st.metric("Estimated Rows", f"~{estimate:,}" if estimate is not None else "unknown",
+                  help="From pg_class.reltuples, refreshed by ANALYZE/autovacuum")
+    with col3:
+        exact = st.session_state.get('quick_exact_counts', {}).get(table)
+        st.metric("Exact Rows", f"{exact:,}" if exact is not None else "—")
+    with col4:
+        st.metric("Columns", len(df.columns))
+    
+    if st.button("Count Rows Exactly", key="quick_exact", help="Runs COUNT(*), which scans the whole table"):
+        total = load_query(f"SELECT COUNT(*) FROM {table_sql}").iloc[0, 0]
+        st.session_state.setdefault('quick_exact_counts', {})[table] = int(total)
+        _rerun_fragment()
+    
+    # Exports cover the whole table, not just the preview
+    st.markdown("#### Export Full Table")
+    _export_controls(f"SELECT * FROM {table_sql} ORDER BY {key}", "quick", table)
+
+def _set_query(query):
+    """Replace the editor text (runs as a callback, before the text area renders)"""
+    st.session_state.sql_input = query
+
+def _load_example():
+    selected = st.session_state.example_selector
+    if selected in EXAMPLE_QUERIES:
+        _set_query(EXAMPLE_QUERIES[selected])
+
+def _format_query():
+    try:
+        _set_query(format_sql(st.session_state.sql_input))
+        st.session_state.sql_notice = ('success', "✓ Query formatted!")
+    except Exception as e:
+        st.session_state.sql_notice = ('error', f"Could not format query: {e}")
+
+@st.fragment(key="sql_editor")
+def _sql_editor():
+    """Editor, examples and query controls; their clicks leave the result grid alone"""
+    # Example queries dropdown
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.selectbox(
+            "Load Example Query",
+            ["-- Select an example --"] + list(EXAMPLE_QUERIES.keys()),
+            key="example_selector"
+        )
+    with col2:
+        st.button("Load Example", key="load_example", on_click=_load_example)
+    
+    # SQL Query Input
+    if 'sql_input' not in st.session_state:
+        st.session_state.sql_input = "SELECT * FROM customer LIMIT 10"
+    
+    custom_query = st.text_area(
+        "SQL Query",
+        height=250,
+        help="Enter any SQL query. Complex queries with JOINs, CTEs, subqueries are supported.",
+        key="sql_input"
+    )
+    
+    timeout_s = st.select_slider(
+        "Time budget",
+        options=TIMEOUT_OPTIONS,
+        value=EXPLORER_TIMEOUT_SECONDS,
+        format_func=lambda s: f"{s}s",
+        help="The statement is cancelled on the server when it runs longer than this",
+        key="sql_timeout"
+    )
+    
+    # Query controls
+    col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 2])
+    
+    with col1:
+        st.button("Run Query", type="primary", key="run_sql", on_click=_submit)
+    with col2:
+        st.button("Format SQL", key="format_sql", on_click=_format_query)
+    with col3:
+        validate_only = st.button("Validate", key="validate_sql")
+    with col4:
+        plan_query = st.button("Plan", key="plan_sql", help="EXPLAIN ANALYZE for SELECTs; plain EXPLAIN for writes")
+    with col5:
+        st.button("Clear", key="clear_sql", on_click=_set_query, args=("",))
+    
+    notice = st.session_state.pop('sql_notice', None)
+    if notice is not None:
+        level, message = notice
+        if level == 'success':
+            st.success(message)
+        else:
+            st.error(message)
+    
+    # Write operations wait for an explicit confirmation
+    pending = st.session_state.get('sql_pending_write')
+    if pending is not None:
+        st.warning(pending['warning'])
+        st.code(pending['query'], language='sql')
+        col1, col2 = st.columns(2)
+        with col1:
+            st.button(f"Execute {pending['type']}", type="primary", key="confirm_write", on_click=_confirm_write)
+        with col2:
+            if st.button("Discard", key="discard_write"):
+                st.session_state.pop('sql_pending_write', None)
+                _rerun_fragment()
+    
+    # Validate query
+    if validate_only:
+        is_safe, query_type, warning = validate_sql_query(custom_query)
+        if is_safe:
+            st.success(f"✓ Query is valid. Type: {query_type or 'SELECT'}")
+            if warning:
+                st.warning(warning)
+        else:
+            st.error(warning or "Query validation failed")
+    
+    # Query plan
+    if plan_query and custom_query:
+        with st.spinner("Explaining query..."):
+            plan, error = explain(custom_query, timeout_ms=timeout_s * 1000)
+        if error:
+            st.error(error)
+        else:
+            _render_plan(plan)
+
+@st.fragment(key="sql_results")
+def _sql_results():
+    """Running statement, last outcome and the streamed result grid (held in session state)"""
+    _poll_job()
+    _render_outcome()
+    _render_stream()
+
+def _copy_to_editor(query):
+    _set_query(query)
+    st.rerun("sql_editor")
+
+def _clear_history():
+    st.session_state.query_history = []
+
+@st.fragment(key="sql_history")
+def _query_history():
+    """History list; its buttons rerun the editor (and results), not the whole page"""
+    if st.session_state.query_history:
+        st.caption(f"Showing {len(st.session_state.query_history)} recent queries")
         
-        # Clear query
-        if clear_query:
-            st.session_state.custom_query = ""
-            st.rerun()
+        for idx, entry in enumerate(st.session_state.query_history):
+            status = entry.get('status', 'ok')
+            with st.expander(
+                f"{idx+1}. {entry['type'] or 'SELECT'} - {entry['timestamp'].strftime('%Y-%m-%d %H:%M:%S')} "
+                f"({entry['rows']} rows, {entry['execution_time']:.3f}s)"
+                + (f" - {STATUS_LABELS[status]}" if status != 'ok' else "")
+            ):
+                st.code(entry['query'], language='sql')
+                
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    st.button("Re-run Query", key=f"rerun_{idx}", on_click=_submit, args=(entry['query'],))
+                with col2:
+                    st.button("Copy to Editor", key=f"copy_{idx}", on_click=_copy_to_editor, args=(entry['query'],))
         
-        # Validate query
-        if validate_only:
-            is_safe, query_type, warning = validate_sql_query(custom_query)
-            if is_safe:
-                st.success(f"✓ Query is valid. Type: {query_type or 'SELECT'}")
-                if warning:
-                    st.warning(warning)
-            else:
-                st.error(warning or "Query validation failed")
+        st.button("Clear History", key="clear_history", on_click=_clear_history)
+    else:
+        st.info("No query history yet. Run some queries in the Advanced SQL Editor tab!")
+
+def leave():
+    """
+    Called by app.py when another page is selected: cancel a running
+    statement and release the open cursor (the fetched rows stay visible).
+    A stream opened after the cancel is closed by its idle deadline.
+    """
+    running = st.session_state.pop('sql_job', None)
+    if running is not None:
+        running['job'].cancel()
+    stream = st.session_state.get('sql_stream')
+    if stream is not None:
+        stream.close()
+
+def render():
+    """Render Data Explorer page"""
+    # Initialize session state for query history
+    if 'query_history' not in st.session_state:
+        st.session_state.query_history = []
+    
+    # Tabs for different modes
+    tab1, tab2, tab3 = st.tabs([
+        "Quick Table View",
+        "Advanced SQL Editor", 
+        "Query History"
+    ])
+    
+    # Each tab body is a fragment, so an interaction reruns only its own part
+    # ========================================
+    # TAB 1: Quick Table View
+    # ========================================
+    with tab1:
+        _quick_table()
+    
+    # ========================================
+    # TAB 2: Advanced SQL Editor
+    # ========================================
+    with tab2:
+        st.markdown('<div class="icon-title"><span class="material-icons">code</span><h3 style="display:inline;">Advanced SQL Query Editor</h3></div>', unsafe_allow_html=True)
+        st.caption("⚡ Supports complex queries: JOINs, CTEs, subqueries, window functions, aggregations, and more")
         
-        # Run query
-        if run_query and custom_query:
-            # Validate first
-            is_safe, query_type, warning = validate_sql_query(custom_query)
-            
-            if not is_safe:
-                st.error(warning or "Query blocked for safety")
-            else:
-                # Show warning for write operations
-                if warning:
-                    st.warning(warning)
-                    confirm = st.checkbox(f"I understand this {query_type} will modify data", key="confirm_write")
-                    if not confirm:
-                        st.stop()
-                
-                # Execute query
-                with st.spinner("Executing query..."):
-                    start_time = datetime.now()
-                    result, error = execute_query_safe(custom_query)
-                    execution_time = (datetime.now() - start_time).total_seconds()
-                    
-                    if error:
-                        st.error(error)
-                    elif result is not None:
-                        # Save to history
-                        st.session_state.query_history.insert(0, {
-                            'query': custom_query,
-                            'timestamp': datetime.now(),
-                            'rows': len(result),
-                            'execution_time': execution_time,
-                            'type': query_type
-                        })
-                        
-                        # Keep only last 50 queries
-                        if len(st.session_state.query_history) > 50:
-                            st.session_state.query_history = st.session_state.query_history[:50]
-                        
-                        # Display results
-                        st.success(f"✓ Query executed successfully in {execution_time:.3f}s")
-                        
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Rows Returned", len(result))
-                        with col2:
-                            st.metric("Columns", len(result.columns) if not result.empty else 0)
-                        with col3:
-                            st.metric("Execution Time", f"{execution_time:.3f}s")
-                        
-                        if not result.empty:
-                            st.dataframe(result, use_container_width=True, height=400)
-                            
-                            # Download options
-                            csv = result.to_csv(index=False).encode('utf-8')
-                            st.download_button(
-                                label="Download Results",
-                                data=csv,
-                                file_name=f"query_result_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                                mime="text/csv",
-                                key="download_result"
-                            )
-                        else:
-                            st.info("Query executed but returned no rows")
+        _sql_editor()
+        _sql_results()
         
         # Query info panel
         with st.expander("Query Guidelines & Security"):
@@ -303,8 +649,10 @@ LIMIT 100"""
             
             **Tips:**
             - Use `LIMIT` to preview large result sets
+            - Pick a time budget for heavy queries; **Cancel** stops a running statement on the server
             - Format your query for better readability
             - Test complex queries with `Validate Only` first
+            - Use **Plan** to see per-node time, row estimates and buffer hits before putting a query on a dashboard
             - Use example queries as templates
             """)
     
@@ -314,29 +662,4 @@ LIMIT 100"""
     with tab3:
         st.markdown('<div class="icon-title"><span class="material-icons">history</span><h3 style="display:inline;">Query Execution History</h3></div>', unsafe_allow_html=True)
         
-        if st.session_state.query_history:
-            st.caption(f"Showing {len(st.session_state.query_history)} recent queries")
-            
-            for idx, entry in enumerate(st.session_state.query_history):
-                with st.expander(
-                    f"{idx+1}. {entry['type'] or 'SELECT'} - {entry['timestamp'].strftime('%Y-%m-%d %H:%M:%S')} "
-                    f"({entry['rows']} rows, {entry['execution_time']:.3f}s)"
-                ):
-                    st.code(entry['query'], language='sql')
-                    
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        if st.button("Re-run Query", key=f"rerun_{idx}"):
-                            st.session_state.custom_query = entry['query']
-                            st.rerun()
-                    with col2:
-                        if st.button("Copy to Editor", key=f"copy_{idx}"):
-                            st.session_state.custom_query = entry['query']
-                            st.success("Copied to editor!")
-                            st.rerun()
-            
-            if st.button("Clear History", key="clear_history"):
-                st.session_state.query_history = []
-                st.rerun()
-        else:
-            st.info("No query history yet. Run some queries in the Advanced SQL Editor tab!")
+        _query_history()
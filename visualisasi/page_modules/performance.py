@@ -0,0 +1,82 @@
+"""
+Performance page - query latency per panel, slow queries and cache efficiency
+"""
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from config import get_pool_stats
+from utils import telemetry, warmup
+
+def _panel_summary(df):
+    """p50/p95/max latency, volume and cache hit ratio per page and panel"""
+    grouped = df.groupby(['page', 'panel'], dropna=False)
+    summary = grouped['latency_ms'].agg(
+        queries='count',
+        p50_ms=lambda s: s.quantile(0.50),
+        p95_ms=lambda s: s.quantile(0.95),
+        max_ms='max',
+    )
+    summary['avg_rows'] = grouped['rows'].mean()
+    summary['avg_kb'] = grouped['result_bytes'].mean() / 1024
+    summary['cache_hit_ratio'] = grouped['cache'].apply(lambda s: s.isin(['memory', 'disk']).mean())
+    return summary.reset_index().sort_values('p95_ms', ascending=False)
+
+def render():
+    """Render Performance page"""
+    st.caption("Query telemetry collected by this app process since it started")
+    st.caption(warmup.describe())
+
+    df = pd.DataFrame(telemetry.records())
+    # Headline numbers are what visitors saw; warm-up runs stay in the panel table
+    visits = df[df['page'] != warmup.TELEMETRY_PAGE] if not df.empty else df
+
+    col1, col2, col3, col4 = st.columns(4)
+    if visits.empty:
+        col1.metric("Queries Recorded", 0)
+    else:
+        cacheable = visits[visits['cache'] != 'none']
+        hit_ratio = cacheable['cache'].isin(['memory', 'disk']).mean() if not cacheable.empty else 0.0
+        misses = visits[visits['cache'].isin(['miss', 'none'])]
+        col1.metric("Queries Recorded", f"{len(visits):,}")
+        col2.metric("Cache Hit Ratio", f"{hit_ratio:.1%}")
+        col3.metric("p50 Latency", f"{visits['latency_ms'].quantile(0.50):,.1f} ms")
+        col4.metric("p95 DB Latency", f"{misses['latency_ms'].quantile(0.95) if not misses.empty else 0:,.1f} ms")
+
+    st.markdown('<div class="icon-title"><span class="material-icons">hub</span><h3 style="display:inline;">Connection Pool</h3></div>', unsafe_allow_html=True)
+    pool = get_pool_stats()
+    if pool:
+        col1, col2, col3, col4, col5 = st.columns(5)
+        col1.metric("Checked Out", f"{pool['checked_out']} / {pool['pool_size']}")
+        col2.metric("Overflow", f"{pool['overflow']} / {pool['max_overflow']}")
+        col3.metric("Blocked Checkouts", f"{pool['waits']:,} / {pool['checkouts']:,}",
+                    help="Checkouts that found the pool exhausted and had to wait")
+        col4.metric("Avg / Max Wait", f"{pool['avg_wait_ms']:.1f} / {pool['max_wait_ms']:.1f} ms")
+        col5.metric("Connects / min", pool['connects_per_minute'])
+    else:
+        st.info("No database engine configured")
+
+    if df.empty:
+        st.info("No queries recorded yet. Open a dashboard page to collect telemetry.")
+        return
+
+    st.divider()
+
+    st.markdown('<div class="icon-title"><span class="material-icons">view_list</span><h3 style="display:inline;">Latency by Panel</h3></div>', unsafe_allow_html=True)
+    summary = _panel_summary(df)
+    fig = px.bar(summary.head(20), x='p95_ms', y='panel', color='page', orientation='h',
+                 title="p95 Latency by Panel (ms)")
+    fig.update_layout(height=450, yaxis={'categoryorder': 'total ascending'})
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(summary, use_container_width=True)
+
+    st.markdown('<div class="icon-title"><span class="material-icons">hourglass_bottom</span><h3 style="display:inline;">Slowest Queries</h3></div>', unsafe_allow_html=True)
+    slowest = df.sort_values('latency_ms', ascending=False).head(20).copy()
+    slowest['time'] = pd.to_datetime(slowest['timestamp'], unit='s')
+    st.dataframe(
+        slowest[['time', 'page', 'panel', 'latency_ms', 'rows', 'result_bytes', 'cache', 'error', 'sql']],
+        use_container_width=True
+    )
+
+    if st.button("Clear Telemetry", key="clear_telemetry"):
+        telemetry.clear()
+        st.rerun()
@@ -1,27 +1,75 @@
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-from utils.database import load_query
+import pandas as pd
+from utils.database import prefetch
+
+# Sales and reviews are aggregated per product before joining, so a product's
+# order lines are never multiplied by its reviews. One row per (store, brand);
+# both panels roll it up, and load_query keeps it until a source table changes.
+PERFORMANCE_SUMMARY = '''
+    WITH sales AS (
+        SELECT product_id,
+               SUM(quantity) AS items_sold,
+               SUM(quantity * unit_price) AS revenue
+        FROM order_items
+        {where:order_items}
+        GROUP BY product_id
+    ),
+    reviews AS (
+        SELECT product_id,
+               COUNT(rating) AS review_count,
+               SUM(rating) AS rating_sum
+        FROM product_review
+        {where:product_review}
+        GROUP BY product_id
+    )
+    SELECT s.name as store,
+           b.name as brand,
+           COUNT(*) as products,
+           SUM(sa.items_sold) as items_sold,
+           SUM(sa.revenue) as revenue,
+           SUM(r.review_count) as review_count,
+           SUM(r.rating_sum) as rating_sum
+    FROM product p
+    LEFT JOIN store s ON p.store_id = s.store_id
+    LEFT JOIN brand b ON p.brand_id = b.brand_id
+    LEFT JOIN sales sa ON p.product_id = sa.product_id
+    LEFT JOIN reviews r ON p.product_id = r.product_id
+    {where:product p}
+    GROUP BY s.name, b.name
+    '''
+
+SUMMARY_MEASURES = ['products', 'items_sold', 'revenue', 'review_count', 'rating_sum']
+STORE_COLUMNS = ['store', 'products', 'items_sold', 'revenue']
+BRAND_COLUMNS = ['brand', 'products', 'items_sold', 'revenue', 'avg_rating']
+
+def tasks():
+    """Every query this page needs, keyed by panel"""
+    return {'performance_summary': PERFORMANCE_SUMMARY}
+
+def rollup(summary, by, columns):
+    """Store or brand performance from the (store, brand) summary"""
+    if summary.empty:
+        return pd.DataFrame(columns=columns)
+    df = summary.dropna(subset=[by]).copy()
+    df[SUMMARY_MEASURES] = df[SUMMARY_MEASURES].apply(pd.to_numeric)
+    df = df.groupby(by, as_index=False)[SUMMARY_MEASURES].sum(min_count=1)
+    df['avg_rating'] = df['rating_sum'] / df['review_count']
+    counts = ['products', 'items_sold', 'review_count', 'rating_sum']
+    df[counts] = df[counts].round().astype('Int64')
+    df = df.sort_values('revenue', ascending=False, na_position='last')
+    return df[columns].reset_index(drop=True)
 
 def render():
-    st.markdown('<div class="icon-title"><span class="material-icons">analytics</span><h2 style="display:inline;">Store & Brand Analytics</h2></div>', unsafe_allow_html=True)
+    data = prefetch(tasks())
+    summary = data['performance_summary']
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown('<div class="icon-title"><span class="material-icons">storefront</span><h3 style="display:inline;">Store Performance</h3></div>', unsafe_allow_html=True)
-        q = '''
-        SELECT s.name as store,
-               COUNT(DISTINCT p.product_id) as products,
-               SUM(oi.quantity) as items_sold,
-               SUM(oi.quantity * oi.unit_price) as revenue
-        FROM store s
-        JOIN product p ON s.store_id = p.store_id
-        LEFT JOIN order_items oi ON p.product_id = oi.product_id
-        GROUP BY s.name
-        ORDER BY revenue DESC
-        '''
-        df = load_query(q)
+        df = rollup(summary, 'store', STORE_COLUMNS)
         if not df.empty:
             fig = px.bar(df, x='store', y='revenue', color='items_sold',
                         title="Store Revenue", color_continuous_scale='Viridis')
@@ -32,20 +80,7 @@ def render():
     
     with col2:
         st.markdown('<div class="icon-title"><span class="material-icons">local_offer</span><h3 style="display:inline;">Brand Performance</h3></div>', unsafe_allow_html=True)
-        q = '''
-        SELECT b.name as brand,
-               COUNT(DISTINCT p.product_id) as products,
-               SUM(oi.quantity) as items_sold,
-               SUM(oi.quantity * oi.unit_price) as revenue,
-               AVG(pr.rating) as avg_rating
-        FROM brand b
-        JOIN product p ON b.brand_id = p.brand_id
-        LEFT JOIN order_items oi ON p.product_id = oi.product_id
-        LEFT JOIN product_review pr ON p.product_id = pr.product_id
-        GROUP BY b.name
-        ORDER BY revenue DESC
-        '''
-        df = load_query(q)
+        df = rollup(summary, 'brand', BRAND_COLUMNS)
         if not df.empty:
             fig = px.scatter(df, x='items_sold', y='revenue', size='products',
                             color='avg_rating', hover_name='brand',
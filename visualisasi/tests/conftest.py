@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests run on the embedded DuckDB database, without the on-disk result
+# cache or the background warm-up
+os.environ.setdefault("DB_BACKEND", "duckdb")
+os.environ.setdefault("RESULT_CACHE_MAX_MB", "0")
+os.environ.setdefault("WARMUP_ENABLED", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
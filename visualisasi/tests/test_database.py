@@ -0,0 +1,27 @@
+"""
+Tests for utils.database
+"""
+import pandas as pd
+from utils import database
+
+
+def test_failed_query_is_retried(monkeypatch):
+    calls = []
+
+    def read_sql_query(sql, con, **kwargs):
+        calls.append(sql)
+        if len(calls) == 1:
+            raise RuntimeError("connection reset")
+        return pd.DataFrame({'n': [1]})
+
+    monkeypatch.setattr(database.pd, "read_sql_query", read_sql_query)
+    database._load_query_cached.clear()
+    sql = "SELECT 1 AS n -- test_failed_query_is_retried"
+
+    assert database.load_query(sql).empty
+    df = database.load_query(sql)
+    assert df['n'].tolist() == [1]
+    assert len(calls) == 2
+    # The successful result is cached
+    database.load_query(sql)
+    assert len(calls) == 2
@@ -0,0 +1,41 @@
+"""
+Tests for the global filter bar (app.py and utils.filters)
+"""
+import contextvars
+import os
+from streamlit.testing.v1 import AppTest
+from utils import filters, telemetry
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def _page_sql(at):
+    """Statements the next run of ``at`` issues for the selected page"""
+    telemetry.clear()
+    at.run()
+    assert not at.exception
+    page = at.sidebar.selectbox[0].value
+    return [record['sql'] for record in telemetry.records() if record['page'] == page]
+
+
+def _has_country_predicate(statements):
+    return any(":country_" in sql for sql in statements)
+
+
+def test_cleared_filter_removes_predicate(monkeypatch):
+    # A script thread reused across reruns still holds the last filters it
+    # set; stand in for that with a stale default
+    stale = contextvars.ContextVar("filters", default={'country': [1]})
+    monkeypatch.setattr(filters, "current", stale)
+    at = AppTest.from_file(APP, default_timeout=120)
+
+    assert not _has_country_predicate(_page_sql(at))
+
+    # Values are country ids (the options show their names)
+    at.sidebar.multiselect(key="filter_country").set_value([1])
+    assert _has_country_predicate(_page_sql(at))
+
+    at.sidebar.multiselect(key="filter_country").set_value([])
+    cleared = _page_sql(at)
+    assert cleared
+    assert not _has_country_predicate(cleared)
@@ -0,0 +1,15 @@
+"""
+Tests for utils.result_cache
+"""
+from utils.result_cache import normalize_sql
+
+
+def test_whitespace_outside_quotes_is_collapsed():
+    assert normalize_sql("SELECT  name\n\tFROM brand ;") == normalize_sql("SELECT name FROM brand")
+
+
+def test_quoted_text_keeps_its_whitespace():
+    assert normalize_sql("SELECT 1 WHERE name = 'a  b'") != normalize_sql("SELECT 1 WHERE name = 'a b'")
+    assert normalize_sql('SELECT "a  b" FROM t') != normalize_sql('SELECT "a b" FROM t')
+    # A line comment ends at its newline, so joining the lines changes the statement
+    assert normalize_sql("SELECT 1 -- x\n, 2") != normalize_sql("SELECT 1 -- x , 2")
@@ -1,5 +1,5 @@
 """Utils package initialization"""
-from .database import load_query
+from .database import load_query, load_kpis, load_grouped, prefetch
 from .validators import validate_sql_query, format_sql, execute_query_safe
 
-__all__ = ['load_query', 'validate_sql_query', 'format_sql', 'execute_query_safe']
+__all__ = ['load_query', 'load_kpis', 'load_grouped', 'prefetch', 'validate_sql_query', 'format_sql', 'execute_query_safe']
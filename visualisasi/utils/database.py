@@ -1,15 +1,365 @@
 """
 Database query utilities
 """
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 import pandas as pd
-from config import engine
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from config import engine, PREFETCH_WORKERS, QUERY_CACHE_TTL, QUERY_CACHE_MAX_ENTRIES, SERIES_REBUILD_SECONDS
+from utils import filters, prepared, result_cache, table_versions, telemetry
 
-@st.cache_data(ttl=300)
-def load_query(q):
-    """Execute SQL query and return DataFrame with caching"""
+# Shared across sessions so concurrent page loads cannot exhaust the pool
+_prefetch_pool = ThreadPoolExecutor(max_workers=max(PREFETCH_WORKERS, 1), thread_name_prefix="prefetch")
+
+# Where the last load_query result on this thread came from (for telemetry)
+_query_source = threading.local()
+
+# Set by collect_sql: load_query records statements instead of running them
+_sql_capture = contextvars.ContextVar("sql_capture", default=None)
+
+# load_series state per (SQL, params) key: closed months, the month they
+# end before, table generations and build time; shared across sessions
+_series_state = OrderedDict()
+_series_lock = threading.Lock()
+# Disk-tier entries holding a series' closed months are keyed under this prefix
+_CLOSED_PREFIX = "-- closed months\n"
+
+def _statement(q, params):
+    """(sql, params) for a SQL string or a text() clause; ``params`` win over bound values"""
+    if isinstance(q, TextClause):
+        # Explicitly bound values are kept, None included (it binds as NULL);
+        # names left unbound must come from ``params`` or the filters
+        bound = {name: bind.value for name, bind in q.compile().binds.items() if not bind.required}
+        return q.text, {**bound, **(params or {})}
+    return q, dict(params or {})
+
+def load_query(q, params=None):
+    """
+    Execute SQL query and return DataFrame, cached until its source tables change.
+    ``q`` is a SQL string or a text() clause; ``:name`` parameters are bound
+    from ``params`` (or the clause's bindparams), so literals never become
+    part of the statement. Filter placeholders are expanded for the current
+    filters (see utils.filters).
+    """
+    sql, params = _statement(q, params)
+    sql, filter_params = filters.bind(sql)
+    params.update(filter_params)
+    captured = _sql_capture.get()
+    if captured is not None:
+        captured.append(sql)
+        return pd.DataFrame()
+    _query_source.value = "memory"
+    start = time.perf_counter()
     try:
-        return pd.read_sql_query(q, engine)
+        df = _load_query_cached(result_cache.normalize_sql(sql), params, table_versions.versions_for(sql), sql)
     except Exception as e:
+        # Raised inside the cached function, so the failure is not cached
+        telemetry.record(sql, time.perf_counter() - start, cache="error", error=str(e))
         st.error(f"Query error: {e}")
         return pd.DataFrame()
+    telemetry.record(sql, time.perf_counter() - start, df, cache=_query_source.value)
+    return df
+
+@st.cache_data(ttl=QUERY_CACHE_TTL or None, max_entries=QUERY_CACHE_MAX_ENTRIES)
+def _load_query_cached(key, params, versions, _sql):
+    """
+    Memory tier keyed by (normalized SQL, parameters, table versions); falls
+    through to the disk tier. ``_sql`` is the statement as written (not hashed).
+    """
+    cached = result_cache.get(key, params, versions=versions)
+    if cached is not None:
+        _query_source.value = "disk"
+        return cached
+    _query_source.value = "miss"
+    # Parameterized statements are prepared server-side; plain ones run as before.
+    # Errors propagate, so neither tier stores a failed result.
+    df = prepared.read_sql(engine, _sql, params) if params else pd.read_sql_query(_sql, engine)
+    result_cache.put(key, df, params, versions=versions)
+    return df
+
+def warm_ahead(q, lead):
+    """
+    Fill the caches for ``q`` under the key it will have ``lead`` seconds from
+    now, if a time-based expiry changes it by then. Returns whether it ran.
+    """
+    sql, params = _statement(q, None)
+    sql, filter_params = filters.bind(sql)
+    params.update(filter_params)
+    ahead = table_versions.versions_for(sql, at=time.time() + lead)
+    if ahead == table_versions.versions_for(sql):
+        return False
+    _load_query_cached(result_cache.normalize_sql(sql), params, ahead, sql)
+    return True
+
+def kpi_query(metrics):
+    """
+    Build one statement that computes every KPI in ``metrics``.
+    ``metrics`` maps a source table to ``{alias: aggregate_expression}``;
+    each table is scanned once (under the global filters) and the single-row
+    results are cross-joined.
+    """
+    parts = []
+    for idx, (table, aggregates) in enumerate(metrics.items()):
+        select_list = ", ".join(f"{expr} AS {alias}" for alias, expr in aggregates.items())
+        parts.append(f"(SELECT {select_list} FROM {table}{{where:{table}}}) AS k{idx}")
+    return "SELECT * FROM " + " CROSS JOIN ".join(parts)
+
+def load_kpis(metrics):
+    """
+    Load a page's metric cards in a single round trip.
+    Returns a dict of alias -> value (None when the query failed).
+    """
+    df = load_query(kpi_query(metrics))
+    aliases = [alias for aggregates in metrics.values() for alias in aggregates]
+    if df.empty:
+        return dict.fromkeys(aliases)
+    row = df.iloc[0]
+    return {alias: row[alias] for alias in aliases}
+
+def grouped_query(table, dimensions, aggregates):
+    """
+    Build a GROUPING SETS statement so sibling group-bys on one table
+    share a single scan. Each dimension gets a ``grouping_<dim>`` flag.
+    """
+    select_list = list(dimensions)
+    select_list += [f"{expr} AS {alias}" for alias, expr in aggregates.items()]
+    select_list += [f"GROUPING({dim}) AS grouping_{dim}" for dim in dimensions]
+    sets = ", ".join(f"({dim})" for dim in dimensions)
+    return f"SELECT {', '.join(select_list)} FROM {table}{{where:{table}}} GROUP BY GROUPING SETS ({sets})"
+
+def load_grouped(table, dimensions, aggregates):
+    """
+    Load several single-column group-bys over ``table`` in one statement.
+    Returns a dict of dimension -> DataFrame[dimension, *aggregates].
+    """
+    df = load_query(grouped_query(table, dimensions, aggregates))
+    result = {}
+    for dim in dimensions:
+        if df.empty:
+            result[dim] = pd.DataFrame(columns=[dim, *aggregates])
+            continue
+        rows = df[df[f"grouping_{dim}"] == 0]
+        result[dim] = rows[[dim, *aggregates]].reset_index(drop=True)
+    return result
+
+def histogram_query(table, column, bins, where=None):
+    """
+    Build an equal-width histogram of ``column`` over the (filtered) table.
+    One row per non-empty bucket (0 .. bins-1) with its count, plus the
+    shared lower bound and bucket width; the maximum falls in the last bucket.
+    """
+    bins = max(int(bins), 1)
+    condition = f"{column} IS NOT NULL" + (f" AND ({where})" if where else "")
+    return f"""
+        WITH bounds AS (
+            SELECT MIN({column}) AS lo, (MAX({column}) - MIN({column})) / {bins} AS width
+            FROM {table}
+            WHERE {condition}{{and:{table}}}
+        ),
+        buckets AS (
+            SELECT CASE WHEN b.width = 0 THEN 0
+                        ELSE LEAST(CAST(FLOOR((t.{column} - b.lo) / b.width) AS INTEGER), {bins - 1})
+                   END AS bucket
+            FROM {table} AS t CROSS JOIN bounds AS b
+            WHERE {condition}{{and:{table} t}}
+        )
+        SELECT k.bucket, k.count, b.lo, b.width
+        FROM (SELECT bucket, COUNT(*) AS count FROM buckets GROUP BY bucket) AS k
+        CROSS JOIN bounds AS b
+        ORDER BY k.bucket
+        """
+
+def load_histogram(table, column, bins=30, where=None):
+    """
+    Distribution of ``column`` binned in the database, so only ``bins`` rows
+    travel however large the table is.
+    Returns a DataFrame[bin_start, bin_end, bin_mid, count], empty buckets included.
+    """
+    df = load_query(histogram_query(table, column, bins, where))
+    if df.empty:
+        return pd.DataFrame(columns=['bin_start', 'bin_end', 'bin_mid', 'count'])
+    lo, width = float(df['lo'].iloc[0]), float(df['width'].iloc[0])
+    buckets = range(max(int(bins), 1)) if width else range(1)
+    counts = df.set_index('bucket')['count'].reindex(buckets, fill_value=0)
+    starts = [lo + b * width for b in buckets]
+    return pd.DataFrame({
+        'bin_start': starts,
+        'bin_end': [start + width for start in starts],
+        'bin_mid': [start + width / 2 for start in starts],
+        'count': counts.astype(int).values,
+    })
+
+def series_query(table, date_column, measures, dimensions=(), since=False):
+    """
+    Build a monthly series of ``measures`` over ``table`` (under the global
+    filters), one row per month and dimension value; ``month`` is a DATE.
+    With ``since``, only rows dated on or after the ``:since`` parameter count.
+    """
+    bucket = f"DATE_TRUNC('month', {date_column})"
+    select_list = [f"CAST({bucket} AS DATE) AS month", *dimensions]
+    select_list += [f"{expr} AS {alias}" for alias, expr in measures.items()]
+    condition = f"{date_column} IS NOT NULL" + (f" AND {date_column} >= :since" if since else "")
+    group_by = ", ".join([bucket, *dimensions])
+    return (f"SELECT {', '.join(select_list)} FROM {table} WHERE {condition}{{and:{table}}} "
+            f"GROUP BY {group_by} ORDER BY month")
+
+def _series_frame(df):
+    if not df.empty:
+        df = df.copy()
+        df['month'] = pd.to_datetime(df['month'])
+    return df
+
+def _closed_series(key, sql, params, generations, marks):
+    """
+    Stored state for a series, restored from the disk tier after a restart.
+    Disk entries are keyed by the tables' watermarks (``marks``), so a
+    reload or backfill made while the app was down is not restored.
+    """
+    with _series_lock:
+        state = _series_state.get(key)
+        if state is not None:
+            _series_state.move_to_end(key)
+    if state is None:
+        if marks is None:
+            return None
+        closed = result_cache.get(_CLOSED_PREFIX + sql, params, versions=marks)
+        if closed is None or closed.empty:
+            return None
+        closed = _series_frame(closed)
+        cutoff = closed['month'].max() + pd.offsets.MonthBegin(1)
+        state = {'closed': closed, 'cutoff': cutoff, 'generations': generations, 'built_at': time.time()}
+        with _series_lock:
+            _series_state[key] = state
+    stale = SERIES_REBUILD_SECONDS and time.time() - state['built_at'] > SERIES_REBUILD_SECONDS
+    if state['generations'] != generations or stale:
+        return None
+    return state
+
+def _store_series(key, sql, params, df, generations, marks, built_at=None):
+    """Keep every month before the newest one in ``df`` as closed"""
+    newest = df['month'].max()
+    closed = df[df['month'] < newest].reset_index(drop=True)
+    state = {'closed': closed, 'cutoff': newest, 'generations': generations, 'built_at': built_at or time.time()}
+    with _series_lock:
+        _series_state[key] = state
+        _series_state.move_to_end(key)
+        while len(_series_state) > max(QUERY_CACHE_MAX_ENTRIES, 1):
+            _series_state.popitem(last=False)
+    if not closed.empty and marks is not None:
+        # Without a rebuild interval the entry still expires with the disk tier
+        result_cache.put(_CLOSED_PREFIX + sql, closed, params, versions=marks, ttl=SERIES_REBUILD_SECONDS or None)
+
+def load_series(table, date_column, measures, dimensions=()):
+    """
+    Monthly series of ``measures`` over ``table``, refreshed incrementally.
+    The first load aggregates the whole history. Months before the newest
+    one are then kept as closed, and later loads aggregate only the rows
+    dated from that newest month on (a range scan on ``date_column``) and
+    append them, so a refresh costs the new data rather than the history.
+    Closed months are rebuilt after this app writes to a source table, or
+    after SERIES_REBUILD_SECONDS.
+    Returns a DataFrame[month, *dimensions, *measures] ordered by month.
+    """
+    sql, params = filters.bind(series_query(table, date_column, measures, dimensions))
+    delta_sql, _ = filters.bind(series_query(table, date_column, measures, dimensions, since=True))
+    key = result_cache.cache_key(sql, params)
+    tables = table_versions.referenced_tables(sql)
+    generations = table_versions.generations(tables)
+    marks = table_versions.watermarks(tables)
+    state = None if _sql_capture.get() is not None else _closed_series(key, sql, params, generations, marks)
+    if state is None:
+        df = _series_frame(load_query(sql, params))
+        if not df.empty:
+            _store_series(key, sql, params, df, generations, marks)
+        return df
+    delta = _series_frame(load_query(delta_sql, {**params, 'since': state['cutoff'].date()}))
+    df = pd.concat([state['closed'], delta], ignore_index=True) if not delta.empty else state['closed'].copy()
+    if not delta.empty and delta['month'].max() > state['cutoff']:
+        # The newest month moved on: everything before it is closed now
+        _store_series(key, sql, params, df, generations, marks, state['built_at'])
+    return df
+
+def keyset_query(table, key, page_size, direction="first", value=None):
+    """
+    Build one page of ``table`` in ``key`` order without OFFSET.
+    ``direction`` is 'first', 'last', 'after' (key > value), 'from'
+    (key >= value) or 'before' (key < value). Every page is an index range
+    scan of ``page_size`` rows, so page 1000 costs the same as page 1.
+    Returns a text() clause: the key value and page size are bind parameters,
+    so all pages of a table share one statement (and one prepared plan).
+    """
+    params = {'page_size': int(page_size)}
+    if direction in ("first", "last"):
+        where = ""
+    else:
+        op = {"after": ">", "from": ">=", "before": "<"}[direction]
+        where = f" WHERE {key} {op} :value"
+        params['value'] = int(value)
+    if direction in ("before", "last"):
+        # Walk the index backwards, then restore ascending order
+        inner = f"SELECT * FROM {table}{where} ORDER BY {key} DESC LIMIT :page_size"
+        return text(f"SELECT * FROM ({inner}) AS page ORDER BY {key}").bindparams(**params)
+    return text(f"SELECT * FROM {table}{where} ORDER BY {key} LIMIT :page_size").bindparams(**params)
+
+def estimated_rows(table):
+    """Fast row-count estimate: pg_class.reltuples, or DuckDB table metadata (None if unknown)"""
+    if engine is not None and engine.dialect.name == "duckdb":
+        # DuckDB keeps an exact row count in its table metadata
+        df = load_query("SELECT estimated_size AS estimate FROM duckdb_tables() WHERE table_name = :name",
+                        {'name': table.strip('"')})
+    else:
+        df = load_query("SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = to_regclass(:name)",
+                        {'name': f"public.{table}"})
+    if df.empty or df.iloc[0, 0] is None or df.iloc[0, 0] < 0:
+        return None
+    return int(df.iloc[0, 0])
+
+def _run_task(name, task, ctx):
+    """Run one prefetch task on a worker thread bound to the page's script context"""
+    add_script_run_ctx(threading.current_thread(), ctx)
+    telemetry.current_panel.set(name)
+    if callable(task):
+        return task()
+    return load_query(task)
+
+def collect_sql(tasks):
+    """
+    SQL statements behind a page's ``tasks()`` without touching the database.
+    Callables are run with load_query capturing instead of executing; filter
+    placeholders are expanded for the current filters.
+    Returns a dict of panel name -> list of statements.
+    """
+    statements = {}
+    for name, task in tasks.items():
+        if not callable(task):
+            statements[name] = [filters.bind(task)[0]]
+            continue
+        captured = []
+        token = _sql_capture.set(captured)
+        try:
+            task()
+        finally:
+            _sql_capture.reset(token)
+        statements[name] = captured
+    return statements
+
+def prefetch(tasks):
+    """
+    Run all of a page's panel queries concurrently before rendering.
+    ``tasks`` maps a panel name to a SQL string (run through ``load_query``)
+    or a zero-argument callable such as ``lambda: load_kpis(KPIS)``.
+    Returns a dict of panel name -> result.
+    """
+    ctx = get_script_run_ctx()
+    futures = {
+        # Each task runs in its own copy of the caller's context (current page)
+        name: _prefetch_pool.submit(contextvars.copy_context().run, _run_task, name, task, ctx)
+        for name, task in tasks.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
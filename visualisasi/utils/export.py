@@ -0,0 +1,201 @@
+"""
+Query exports - re-run a SELECT through a server-side cursor and stream it to a file
+"""
+import csv
+import gzip
+import os
+import tempfile
+import time
+import weakref
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from config import engine, EXPORT_CHUNK_ROWS, EXPORT_DIR, EXPORT_MAX_AGE_SECONDS
+from utils.query_control import apply_timeout
+
+# label -> (file extension, MIME type)
+FORMATS = {
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Arrow IPC": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+_PREFIX = "export_"
+
+class _Owner:
+    """Held in the export info; deletes the file once the session state holding it is dropped"""
+    def __init__(self, path):
+        weakref.finalize(self, remove, path)
+
+def _sweep(directory):
+    """Delete export files older than EXPORT_MAX_AGE_SECONDS"""
+    cutoff = time.time() - EXPORT_MAX_AGE_SECONDS
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            if name.startswith(_PREFIX) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+def _unique(columns):
+    """Arrow and Parquet need distinct column names (SELECT a.id, b.id ...)"""
+    seen = {}
+    names = []
+    for name in columns:
+        name = str(name)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}_{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def _stable_type(dtype):
+    """Widen types inferred from the first chunk so later chunks still fit"""
+    if pa.types.is_null(dtype):
+        return pa.string()
+    if pa.types.is_decimal(dtype):
+        return pa.decimal128(38, 10)
+    if pa.types.is_integer(dtype):
+        return pa.int64()
+    return dtype
+
+def _to_arrow(chunk, schema):
+    """Convert one chunk, cast to ``schema`` (inferred from it when None)"""
+    table = pa.Table.from_pandas(chunk, preserve_index=False)
+    if schema is None:
+        schema = pa.schema([pa.field(f.name, _stable_type(f.type)) for f in table.schema])
+    columns = []
+    for i, field in enumerate(schema):
+        column = table.column(i)
+        if column.type != field.type:
+            try:
+                column = column.cast(field.type, safe=not pa.types.is_decimal(field.type))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                if not pa.types.is_string(field.type):
+                    raise
+                column = pa.array([None if v is None else str(v) for v in column.to_pylist()], pa.string())
+        columns.append(column)
+    return pa.Table.from_arrays(columns, schema=schema), schema
+
+class _CsvWriter:
+    def __init__(self, path):
+        self._file = gzip.open(path, "wt", encoding="utf-8", newline="")
+        self._header = True
+
+    def write(self, chunk):
+        chunk.to_csv(self._file, index=False, header=self._header, quoting=csv.QUOTE_MINIMAL)
+        self._header = False
+
+    def close(self):
+        self._file.close()
+
+class _ArrowWriter:
+    """Parquet or Arrow IPC; the schema is fixed by the first chunk"""
+    def __init__(self, path, parquet):
+        self._path = path
+        self._parquet = parquet
+        self._schema = None
+        self._sink = None
+        self._writer = None
+
+    def write(self, chunk):
+        table, self._schema = _to_arrow(chunk, self._schema)
+        if self._writer is None:
+            if self._parquet:
+                self._writer = pq.ParquetWriter(self._path, self._schema, compression="zstd")
+            else:
+                self._sink = pa.OSFile(self._path, "wb")
+                self._writer = pa.ipc.new_file(self._sink, self._schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+def _writer(fmt, path):
+    extension = FORMATS[fmt][0]
+    if extension == "csv.gz":
+        return _CsvWriter(path)
+    return _ArrowWriter(path, parquet=extension == "parquet")
+
+def export_query(query, fmt, chunk_rows=None, timeout_ms=None, progress=None):
+    """
+    Stream the full result of ``query`` into a temporary file
+    Only one chunk is in memory at a time. ``progress(rows)`` is called after
+    every chunk. Returns: (export_info, error_message)
+    """
+    if fmt not in FORMATS:
+        return None, f"Unknown export format: {fmt}"
+    chunk_rows = max(chunk_rows or EXPORT_CHUNK_ROWS, 1)
+    start = time.perf_counter()
+    if EXPORT_DIR:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+    _sweep(EXPORT_DIR or tempfile.gettempdir())
+    fd, path = tempfile.mkstemp(prefix=_PREFIX, suffix="." + FORMATS[fmt][0], dir=EXPORT_DIR or None)
+    os.close(fd)
+
+    rows = 0
+    writer = _writer(fmt, path)
+    try:
+        with engine.connect() as conn:
+            apply_timeout(conn, timeout_ms)
+            result = conn.execute(
+                text(query),
+                execution_options={'stream_results': True, 'max_row_buffer': chunk_rows}
+            )
+            columns = list(result.keys())
+            if FORMATS[fmt][0] != "csv.gz":
+                columns = _unique(columns)
+            while True:
+                batch = result.fetchmany(chunk_rows)
+                if not batch and rows:
+                    break
+                # An empty result still writes the header / schema
+                writer.write(pd.DataFrame.from_records(batch, columns=columns))
+                rows += len(batch)
+                if progress is not None:
+                    progress(rows)
+                if not batch:
+                    break
+            conn.rollback()
+        writer.close()
+    except Exception as e:
+        try:
+            writer.close()
+        except Exception:
+            pass
+        remove(path)
+        return None, f"❌ Export failed: {str(e)}"
+
+    return {
+        'path': path,
+        'format': fmt,
+        'extension': FORMATS[fmt][0],
+        'mime': FORMATS[fmt][1],
+        'rows': rows,
+        'bytes': os.path.getsize(path),
+        'seconds': time.perf_counter() - start,
+        'owner': _Owner(path),
+    }, None
+
+def read(path):
+    """Contents of an export file; passed to st.download_button as a deferred callable"""
+    with open(path, "rb") as export_file:
+        return export_file.read()
+
+def remove(path):
+    """Delete an export file once it is no longer offered for download"""
+    try:
+        os.remove(path)
+    except (OSError, TypeError):
+        pass
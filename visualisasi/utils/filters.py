@@ -0,0 +1,132 @@
+"""
+Global dashboard filters pushed down into page SQL
+Page queries mark where predicates go with ``{where:table alias, ...}`` or
+``{and:table alias, ...}``; bind() expands them for the active filters as
+bound parameters, and to nothing when no filter is set.
+"""
+import contextvars
+import datetime
+import re
+
+FILTERS = ['date', 'status', 'country', 'category', 'store']
+
+# Per table: the column each filter compares directly, and the keys that
+# reach filters living on another table as (column, table, key, filters).
+# Dates filter each table's own event date, so they never follow a key.
+SCOPES = {
+    'customer': ({'date': 'signup_date', 'country': 'country_id'}, []),
+    'customer_address': ({}, [('customer_id', 'customer', 'customer_id', ['date', 'country'])]),
+    'product': ({'category': 'category_id', 'store': 'store_id'}, []),
+    'order': (
+        {'date': 'order_date', 'status': 'order_status'},
+        [('customer_id', 'customer', 'customer_id', ['country']),
+         ('order_id', 'order_items', 'order_id', ['category', 'store'])],
+    ),
+    'order_items': ({}, [
+        ('order_id', 'order', 'order_id', ['date', 'status', 'country']),
+        ('product_id', 'product', 'product_id', ['category', 'store']),
+    ]),
+    'shipping': ({}, [('shipping_id', 'order', 'shipping_id', FILTERS)]),
+    'product_review': (
+        {'date': 'review_date'},
+        [('customer_id', 'customer', 'customer_id', ['country']),
+         ('product_id', 'product', 'product_id', ['category', 'store'])],
+    ),
+    'stock': ({'date': 'change_date'}, [('product_id', 'product', 'product_id', ['category', 'store'])]),
+}
+
+# Choices offered by the filter bar, as (value, label) rows
+OPTION_QUERIES = {
+    'country': "SELECT country_id AS value, name AS label FROM country ORDER BY name",
+    'category': "SELECT category_id AS value, name AS label FROM category ORDER BY name",
+    'store': "SELECT store_id AS value, name AS label FROM store ORDER BY name",
+    'status': '''
+        SELECT DISTINCT order_status AS value, order_status AS label
+        FROM "order"
+        WHERE order_status IS NOT NULL
+        ORDER BY value
+        ''',
+}
+
+# Set by app.py for the page being rendered; prefetch workers inherit it
+current = contextvars.ContextVar("filters", default={})
+
+_PLACEHOLDER = re.compile(r"\{(where|and):([^}]*)\}")
+
+def context(date_range=None, **selected):
+    """
+    Filter context from the sidebar values.
+    ``date_range`` is a (start, end) pair, both inclusive; the lists in
+    ``selected`` are keyed by filter name. Unset filters are left out.
+    """
+    ctx = {name: list(values) for name, values in selected.items() if name in FILTERS and values}
+    if date_range and len(date_range) == 2:
+        start, end = date_range
+        ctx['date'] = (start, end + datetime.timedelta(days=1))
+    return ctx
+
+def _column(alias, column):
+    return f"{alias}.{column}" if alias else column
+
+def _condition(name, column, ctx, params):
+    """``column`` tested against filter ``name``; its values go into ``params``"""
+    if name == 'date':
+        params['date_from'], params['date_until'] = ctx['date']
+        return f"{column} >= :date_from AND {column} < :date_until"
+    names = []
+    for idx, value in enumerate(ctx[name]):
+        params[f"{name}_{idx}"] = value
+        names.append(f":{name}_{idx}")
+    return f"{column} IN ({', '.join(names)})"
+
+def predicate(table, alias, ctx, params, wanted=FILTERS):
+    """AND-ed conditions restricting ``table`` to the filters in ``wanted``, or ''"""
+    if table not in SCOPES:
+        return ""
+    own, keys = SCOPES[table]
+    clauses = [
+        _condition(name, _column(alias, own[name]), ctx, params)
+        for name in wanted if name in own and name in ctx
+    ]
+    for column, parent, parent_key, carried in keys:
+        subset = [name for name in carried if name in wanted and name in ctx]
+        if not subset:
+            continue
+        inner = predicate(parent, None, ctx, params, subset)
+        clauses.append(f'{_column(alias, column)} IN (SELECT {parent_key} FROM "{parent}" WHERE {inner})')
+    return " AND ".join(clauses)
+
+def bind(sql, ctx=None):
+    """
+    Expand the filter placeholders in ``sql`` for ``ctx`` (default: the
+    current filters). Returns (sql, params); params is empty when no filter
+    applies, and the SQL then matches what the page ran unfiltered.
+    """
+    ctx = current.get() if ctx is None else ctx
+    params = {}
+
+    def expand(match):
+        keyword, targets = match.groups()
+        clauses = []
+        for target in targets.split(","):
+            parts = target.split()
+            clause = predicate(parts[0].strip('"'), parts[1] if len(parts) > 1 else None, ctx, params)
+            if clause:
+                clauses.append(clause)
+        if not clauses:
+            return ""
+        return (" WHERE " if keyword == "where" else " AND ") + " AND ".join(clauses)
+
+    return _PLACEHOLDER.sub(expand, sql), params
+
+def describe(ctx, labels):
+    """Short human summary of ``ctx``; ``labels`` maps filter -> {value: label}"""
+    parts = []
+    if 'date' in ctx:
+        start, until = ctx['date']
+        parts.append(f"{start:%Y-%m-%d} – {until - datetime.timedelta(days=1):%Y-%m-%d}")
+    for name in FILTERS[1:]:
+        if name in ctx:
+            names = [str(labels.get(name, {}).get(value, value)) for value in ctx[name]]
+            parts.append(f"{name}: {', '.join(names)}")
+    return "; ".join(parts)
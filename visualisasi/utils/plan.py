@@ -0,0 +1,204 @@
+"""
+Query plan inspection - EXPLAIN output flattened for display, with index hints
+"""
+import json
+import re
+import pandas as pd
+from sqlalchemy import text
+from config import engine, SCHEMA_DDL_PATH, PLAN_SEQSCAN_MIN_ROWS
+from utils.query_control import apply_timeout
+from utils.validators import validate_sql_query
+
+WRITE_TYPES = ['INSERT', 'UPDATE', 'DELETE']
+
+_TABLE_RE = re.compile(r'CREATE\s+TABLE\s+("?\w+"?)\s*\((.*?)\n\);', re.IGNORECASE | re.DOTALL)
+_INDEX_RE = re.compile(r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+(\w+)\s+ON\s+("?\w+"?)\s*\(([^)]*)\)', re.IGNORECASE)
+_WORD_RE = re.compile(r'[A-Za-z_]\w*')
+
+_INDEXES_SQL = text("""
+    SELECT tablename, indexname
+    FROM pg_indexes
+    WHERE schemaname = 'public'
+""")
+_RELTUPLES_SQL = text("""
+    SELECT c.relname, c.reltuples::bigint AS estimated_rows
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public' AND c.relkind = 'r'
+""")
+
+def _unquote(name):
+    return name.strip().strip('"')
+
+def declared_schema(path=None):
+    """
+    Columns and indexes declared in the project DDL
+    Returns: {table: {'columns': [...], 'indexes': {index_name: [columns]}}}
+    """
+    try:
+        with open(path or SCHEMA_DDL_PATH, encoding="utf-8") as f:
+            ddl = f.read()
+    except OSError:
+        return {}
+    ddl = re.sub(r'--[^\n]*', '', ddl)
+
+    schema = {}
+    for raw_table, body in _TABLE_RE.findall(ddl):
+        table = _unquote(raw_table)
+        entry = schema.setdefault(table, {'columns': [], 'indexes': {}})
+        depth = 0
+        for line in body.split('\n'):
+            line = line.strip()
+            # Only lines at depth 0 start a column; deeper ones continue a CHECK (...)
+            inside, depth = depth > 0, depth + line.count('(') - line.count(')')
+            if inside or not line or line.upper().startswith(('CONSTRAINT', 'PRIMARY', 'FOREIGN', 'UNIQUE', 'CHECK')):
+                continue
+            column = _WORD_RE.match(line)
+            if column is None:
+                continue
+            entry['columns'].append(column.group(0))
+            if 'PRIMARY KEY' in line.upper():
+                entry['indexes'][f"{table}_pkey"] = [column.group(0)]
+    for name, raw_table, columns in _INDEX_RE.findall(ddl):
+        entry = schema.setdefault(_unquote(raw_table), {'columns': [], 'indexes': {}})
+        entry['indexes'][name] = [_unquote(c) for c in columns.split(',')]
+    return schema
+
+def flatten(plan, depth=0, rows=None):
+    """Plan tree as one dict per node, parents first"""
+    if rows is None:
+        rows = []
+    loops = plan.get('Actual Loops', 1) or 1
+    children = plan.get('Plans', [])
+    total_ms = plan.get('Actual Total Time')
+    if total_ms is not None:
+        total_ms *= loops
+        child_ms = sum((c.get('Actual Total Time') or 0) * (c.get('Actual Loops', 1) or 1) for c in children)
+        # Exclusive time; parallel children can exceed the parent, so clamp at zero
+        self_ms = max(total_ms - child_ms, 0.0)
+    else:
+        self_ms = None
+
+    estimated = plan.get('Plan Rows')
+    actual = plan.get('Actual Rows')
+    if actual is not None:
+        actual *= loops
+        est_total = (estimated or 0) * loops
+        # How far off the planner was, always >= 1 (x under/over-estimated)
+        misestimate = max(actual, 1) / max(est_total, 1)
+        misestimate = misestimate if misestimate >= 1 else 1 / misestimate
+    else:
+        misestimate = None
+
+    hit = plan.get('Shared Hit Blocks')
+    read = plan.get('Shared Read Blocks')
+    relation = plan.get('Relation Name')
+    label = plan['Node Type']
+    if relation:
+        label += f" on {relation}"
+        if plan.get('Alias') and plan['Alias'] != relation:
+            label += f" {plan['Alias']}"
+    if plan.get('Index Name'):
+        label += f" using {plan['Index Name']}"
+
+    rows.append({
+        'depth': depth,
+        'node': "    " * depth + "→ " + label,
+        'node_type': plan['Node Type'],
+        'relation': relation,
+        'index': plan.get('Index Name'),
+        'total_ms': total_ms,
+        'self_ms': self_ms,
+        'loops': plan.get('Actual Loops'),
+        'est_rows': estimated,
+        'actual_rows': actual,
+        'misestimate_x': misestimate,
+        'shared_hit': hit,
+        'shared_read': read,
+        'hit_ratio': hit / (hit + read) if hit is not None and read is not None and hit + read else None,
+        'filter': plan.get('Filter') or plan.get('Index Cond') or plan.get('Hash Cond') or plan.get('Join Filter'),
+        'rows_removed': plan.get('Rows Removed by Filter'),
+        'cost': plan.get('Total Cost'),
+    })
+    for child in children:
+        flatten(child, depth + 1, rows)
+    return rows
+
+def _live_catalog(conn):
+    """(live index names per table, estimated rows per table) from the catalog"""
+    live = {}
+    for table, index in conn.execute(_INDEXES_SQL):
+        live.setdefault(table, set()).add(index)
+    sizes = {name: int(n) for name, n in conn.execute(_RELTUPLES_SQL)}
+    return live, sizes
+
+def index_hints(nodes, live_indexes, table_rows, schema=None):
+    """Sequential scans over large tables, checked against the declared indexes"""
+    schema = declared_schema() if schema is None else schema
+    hints = []
+    for node in nodes:
+        if node['node_type'] != 'Seq Scan' or not node['relation']:
+            continue
+        table = node['relation']
+        size = max(table_rows.get(table, 0), node['actual_rows'] or 0, node['est_rows'] or 0)
+        if size < PLAN_SEQSCAN_MIN_ROWS:
+            continue
+
+        declared = schema.get(table, {'columns': [], 'indexes': {}})
+        filter_cols = sorted(set(_WORD_RE.findall(node['filter'] or '')) & set(declared['columns']))
+        message = f"Seq Scan on **{table}** (~{size:,} rows)"
+        if not filter_cols:
+            hints.append(message + " reads the whole table. Expected for whole-table aggregates; otherwise add a WHERE clause or LIMIT.")
+            continue
+
+        matching = {name: cols for name, cols in declared['indexes'].items() if cols and cols[0] in filter_cols}
+        missing = sorted(name for name in matching if name not in live_indexes.get(table, set()))
+        if missing:
+            hints.append(message + f" filters on {', '.join(filter_cols)}. "
+                         f"{', '.join(missing)} is declared in supabase_ddl.sql but missing from the database.")
+        elif matching:
+            hints.append(message + f" filters on {', '.join(filter_cols)} although "
+                         f"{', '.join(sorted(matching))} exists. The filter is probably not selective "
+                         "enough, or wraps the column in a cast/function the index cannot serve.")
+        else:
+            hints.append(message + f" filters on {', '.join(filter_cols)} and no declared index leads with "
+                         f"{'it' if len(filter_cols) == 1 else 'any of them'}. "
+                         f"Consider CREATE INDEX ON {table} ({filter_cols[0]}).")
+    return hints
+
+def explain(query, timeout_ms=None):
+    """
+    EXPLAIN ANALYZE a SELECT (inside a rolled-back transaction), or plain
+    EXPLAIN a write so nothing is modified
+    Returns: (plan_info, error_message)
+    """
+    if engine is None or engine.dialect.name != "postgresql":
+        return None, "Query plans are only available on PostgreSQL"
+    is_safe, query_type, warning = validate_sql_query(query)
+    if not is_safe:
+        return None, warning
+    analyze = query_type not in WRITE_TYPES
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    statement = query.strip().rstrip(';')
+
+    try:
+        with engine.connect() as conn:
+            apply_timeout(conn, timeout_ms)
+            raw = conn.execute(text(f"EXPLAIN ({options}) {statement}")).scalar()
+            live_indexes, table_rows = _live_catalog(conn)
+            # ANALYZE executed the statement; never keep its side effects
+            conn.rollback()
+    except Exception as e:
+        return None, f"❌ Error: {str(e)}"
+
+    document = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    nodes = flatten(document['Plan'])
+    return {
+        'analyzed': analyze,
+        'query_type': query_type,
+        'planning_ms': document.get('Planning Time'),
+        'execution_ms': document.get('Execution Time'),
+        'nodes': pd.DataFrame(nodes),
+        'hints': index_hints(nodes, live_indexes, table_rows),
+        'raw': document,
+    }, None
@@ -0,0 +1,110 @@
+"""
+Server-side prepared statements for parameterized queries
+Each statement shape is PREPAREd once per pooled connection and then run with
+EXECUTE, so PostgreSQL parses and plans it once instead of on every call.
+"""
+import hashlib
+import threading
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql.psycopg2 import PGDialect_psycopg2
+from config import DB_PREPARED_STATEMENTS, DB_PREPARED_MAX
+from utils.query_control import pgcode
+
+# Compiles text() binds to $1, $2, ...; a repeated name reuses its number
+_DIALECT = PGDialect_psycopg2(paramstyle="numeric_dollar")
+
+# EXECUTE errors a fresh PREPARE fixes: the statement is gone from the
+# server (invalid_sql_statement_name) or a schema change altered its result
+# type (feature_not_supported, "cached plan must not change result type")
+_RETRY_PGCODES = {'26000', '0A000'}
+
+# Shapes PostgreSQL refused to prepare (e.g. an untyped parameter)
+_unpreparable = set()
+_lock = threading.Lock()
+
+def enabled(engine):
+    """Whether parameterized statements on ``engine`` are prepared server-side"""
+    return DB_PREPARED_STATEMENTS and engine is not None and engine.dialect.name == "postgresql"
+
+def statement_name(body):
+    """Stable prepared-statement name for a compiled statement"""
+    return "q_" + hashlib.sha1(body.encode("utf-8")).hexdigest()[:16]
+
+def compile_statement(sql):
+    """(body with $n placeholders, parameter names in $n order) for ``sql``"""
+    compiled = text(sql).compile(dialect=_DIALECT)
+    return str(compiled), compiled.positiontup
+
+def _discard(dbapi_conn, prepared, name):
+    """Forget ``name`` on this connection after a failed EXECUTE"""
+    prepared.discard(name)
+    try:
+        dbapi_conn.rollback()
+        cursor = dbapi_conn.cursor()
+        cursor.execute(f"DEALLOCATE {name}")
+        cursor.close()
+        dbapi_conn.commit()
+    except Exception:
+        dbapi_conn.rollback()
+
+def _prepare(dbapi_conn, prepared, name, body):
+    """PREPARE ``name`` on this connection; returns False if PostgreSQL refuses it"""
+    cursor = dbapi_conn.cursor()
+    try:
+        if len(prepared) >= DB_PREPARED_MAX:
+            cursor.execute("DEALLOCATE ALL")
+            prepared.clear()
+        # No arguments, so psycopg2 leaves any % in the body alone
+        cursor.execute(f"PREPARE {name} AS {body}")
+        prepared.add(name)
+        return True
+    except Exception:
+        dbapi_conn.rollback()
+        return False
+    finally:
+        cursor.close()
+
+def _execute(dbapi_conn, name, names, params):
+    cursor = dbapi_conn.cursor()
+    try:
+        if names:
+            placeholders = ", ".join(["%s"] * len(names))
+            cursor.execute(f"EXECUTE {name} ({placeholders})", tuple(params[n] for n in names))
+        else:
+            cursor.execute(f"EXECUTE {name}")
+        columns = [col[0] for col in cursor.description]
+        # coerce_float matches pd.read_sql_query for NUMERIC columns
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
+    finally:
+        cursor.close()
+
+def read_sql(engine, sql, params):
+    """
+    DataFrame for ``sql`` with ``params`` bound (a text()-style statement).
+    On PostgreSQL the shape is prepared on the pooled connection the first
+    time that connection sees it; other backends, and shapes that cannot be
+    prepared, run as a bound text() statement. An EXECUTE that fails
+    because the server dropped the statement or a schema change invalidated
+    its plan is prepared again and retried once; any other error (timeout,
+    cancel, SQL error) is raised straight away.
+    """
+    if not enabled(engine) or sql in _unpreparable:
+        return pd.read_sql_query(text(sql), engine, params=params)
+    body, names = compile_statement(sql)
+    name = statement_name(body)
+    with engine.connect() as conn:
+        dbapi_conn = conn.connection
+        # Lives as long as the DBAPI connection, like the server-side statements
+        prepared = dbapi_conn.info.setdefault("prepared_statements", set())
+        for attempt in range(2):
+            if name not in prepared and not _prepare(dbapi_conn, prepared, name, body):
+                with _lock:
+                    _unpreparable.add(sql)
+                return pd.read_sql_query(text(sql), conn, params=params)
+            try:
+                return _execute(dbapi_conn, name, names, params)
+            except Exception as e:
+                _discard(dbapi_conn, prepared, name)
+                if attempt or pgcode(e) not in _RETRY_PGCODES:
+                    raise
@@ -0,0 +1,8 @@
+"""
+Query definitions shared by several dashboard pages
+Kept out of the page modules so one page never imports another.
+"""
+
+# Overview and Order pages read the same cached GROUPING SETS scan of "order"
+ORDER_BREAKDOWN = ['order_status', 'payment_method']
+ORDER_MEASURES = {'count': 'COUNT(*)', 'revenue': 'SUM(total_amount)'}
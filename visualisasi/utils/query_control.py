@@ -0,0 +1,111 @@
+"""
+Ad-hoc query control - per-statement time budget and backend cancel
+"""
+import contextvars
+import threading
+import time
+from sqlalchemy import text
+
+# SQLSTATE raised for both statement_timeout and pg_cancel_backend
+QUERY_CANCELED = "57014"
+
+def apply_timeout(conn, timeout_ms):
+    """SET LOCAL statement_timeout for the transaction open on ``conn``"""
+    if not timeout_ms or conn.dialect.name != "postgresql":
+        return
+    # SET does not take bind parameters; the value is forced to an integer
+    conn.execute(text(f"SET LOCAL statement_timeout = {int(timeout_ms)}"))
+
+def pgcode(exc):
+    """SQLSTATE of a psycopg2 error, raw or wrapped by SQLAlchemy (None otherwise)"""
+    return getattr(getattr(exc, "orig", None), "pgcode", None) or getattr(exc, "pgcode", None)
+
+class QueryJob:
+    """
+    Runs ``fn(job)`` on a worker thread so the page can poll it and cancel it.
+    ``fn`` returns (value, error_message) like execute_query_safe, calls
+    ``job.attach(conn)`` once it holds a connection and stores any exception
+    on ``job.exception``.
+    """
+    def __init__(self, fn):
+        self.fn = fn
+        self.value = None
+        self.error = None
+        self.exception = None
+        self.cancel_requested = False
+        self.started_at = None
+        self.finished_at = None
+        self._conn = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Begin running on a daemon thread (keeps the caller's contextvars)"""
+        self.started_at = time.perf_counter()
+        ctx = contextvars.copy_context()
+        self._thread = threading.Thread(target=ctx.run, args=(self._run,), daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.value, self.error = self.fn(self)
+        except Exception as e:
+            self.exception = e
+            self.error = f"❌ Error: {str(e)}"
+        finally:
+            with self._lock:
+                self._conn = None
+            self.finished_at = time.perf_counter()
+
+    def attach(self, conn):
+        """Register the connection running the statement"""
+        with self._lock:
+            self._conn = conn
+            cancel_now = self.cancel_requested
+        if cancel_now:
+            self._send_cancel(conn)
+
+    def cancel(self):
+        """Ask the server to cancel the running statement"""
+        with self._lock:
+            self.cancel_requested = True
+            conn = self._conn
+        if conn is not None:
+            self._send_cancel(conn)
+
+    @staticmethod
+    def _send_cancel(conn):
+        try:
+            dbapi_conn = conn.connection.dbapi_connection
+            if hasattr(dbapi_conn, "cancel"):
+                # psycopg2 opens a separate cancel request to the backend
+                dbapi_conn.cancel()
+            elif hasattr(dbapi_conn, "interrupt"):
+                # DuckDB stops the running query in-process
+                dbapi_conn.interrupt()
+        except Exception:
+            pass
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    @property
+    def status(self):
+        """'running', 'ok', 'timeout', 'cancelled' or 'error'"""
+        if not self.done:
+            return "running"
+        if self.error is None:
+            return "ok"
+        if self.cancel_requested:
+            return "cancelled"
+        if pgcode(self.exception) == QUERY_CANCELED:
+            return "timeout"
+        return "error"
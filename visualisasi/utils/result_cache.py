@@ -0,0 +1,137 @@
+"""
+Persistent result cache - second tier behind st.cache_data
+Frames are stored as Arrow IPC files so a hit is a memory-mapped read
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import pyarrow as pa
+from config import RESULT_CACHE_DIR, RESULT_CACHE_MAX_BYTES, RESULT_CACHE_TTL
+
+_EXPIRES_KEY = b"result_cache.expires_at"
+_SUFFIX = ".arrow"
+_evict_lock = threading.Lock()
+
+# Literals, quoted identifiers and comments are kept verbatim; only the
+# whitespace between them is collapsed (a line comment keeps its newline)
+_SQL_TOKEN = re.compile(r"""
+    (?P<keep>
+        (?<!\w)[Ee]'(?:[^'\\]|\\.|'')*'  # E'...' with backslash escapes
+      | '(?:[^']|'')*'                  # '...'
+      | "(?:[^"]|"")*"                  # "identifier"
+      | \$(?P<tag>\w*)\$.*?\$(?P=tag)\$  # $tag$ ... $tag$
+      | --[^\n]*(?:\n|$)                # -- comment
+      | /\*.*?\*/                       # /* comment */
+    )
+    | (?P<space>\s+)
+""", re.VERBOSE | re.DOTALL)
+
+def enabled():
+    """Whether the disk tier is configured"""
+    return bool(RESULT_CACHE_DIR) and RESULT_CACHE_MAX_BYTES > 0
+
+def normalize_sql(sql):
+    """
+    Collapse whitespace outside quotes and comments, and drop trailing
+    semicolons, so equivalent SQL shares a key. Quoted text is left as is,
+    so 'a  b' and 'a b' stay different statements.
+    """
+    normalized = _SQL_TOKEN.sub(lambda m: m.group('keep') or " ", sql)
+    return normalized.strip().rstrip(";").strip()
+
+def cache_key(sql, params=None, versions=()):
+    """Stable key for (normalized SQL, parameters, source table versions)"""
+    payload = json.dumps([normalize_sql(sql), params or {}, list(versions)], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _path(key):
+    return os.path.join(RESULT_CACHE_DIR, key + _SUFFIX)
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def get(sql, params=None, versions=()):
+    """Return the cached DataFrame, or None on a miss or expired entry"""
+    if not enabled():
+        return None
+    path = _path(cache_key(sql, params, versions))
+    try:
+        with pa.memory_map(path, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+    metadata = table.schema.metadata or {}
+    expires_at = float(metadata.get(_EXPIRES_KEY, 0) or 0)
+    if expires_at and expires_at < time.time():
+        _remove(path)
+        return None
+    try:
+        # Touch so eviction sees this entry as recently used
+        os.utime(path)
+    except OSError:
+        pass
+    return table.to_pandas()
+
+def put(sql, df, params=None, versions=(), ttl=None):
+    """Store ``df`` for (sql, params); frames Arrow cannot encode are skipped"""
+    if not enabled():
+        return
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, ValueError, TypeError):
+        return
+    ttl = RESULT_CACHE_TTL if ttl is None else ttl
+    metadata = dict(table.schema.metadata or {})
+    metadata[_EXPIRES_KEY] = str(time.time() + ttl if ttl > 0 else 0).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    os.makedirs(RESULT_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=RESULT_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, _path(cache_key(sql, params, versions)))
+    except OSError:
+        _remove(tmp_path)
+        return
+    _evict()
+
+def _evict():
+    """Drop least recently used entries until the directory is under budget"""
+    with _evict_lock:
+        try:
+            names = [n for n in os.listdir(RESULT_CACHE_DIR) if n.endswith(_SUFFIX)]
+        except OSError:
+            return
+        entries = []
+        for name in names:
+            path = os.path.join(RESULT_CACHE_DIR, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if total <= RESULT_CACHE_MAX_BYTES:
+            return
+        for _, size, path in sorted(entries):
+            _remove(path)
+            total -= size
+            if total <= RESULT_CACHE_MAX_BYTES:
+                break
+
+def clear():
+    """Remove every cached result from disk"""
+    if not RESULT_CACHE_DIR or not os.path.isdir(RESULT_CACHE_DIR):
+        return
+    for name in os.listdir(RESULT_CACHE_DIR):
+        if name.endswith(_SUFFIX):
+            _remove(os.path.join(RESULT_CACHE_DIR, name))
@@ -0,0 +1,160 @@
+"""
+Streaming query results - server-side cursor paged on demand
+"""
+import threading
+import time
+import weakref
+import pandas as pd
+from sqlalchemy import text
+from config import engine, EXPLORER_PAGE_ROWS, EXPLORER_MAX_ROWS, EXPLORER_MAX_BYTES, EXPLORER_STREAM_IDLE_SECONDS
+from utils import telemetry
+from utils.query_control import apply_timeout
+
+# Open streams, checked by the reaper thread; a stream dropped with its
+# session leaves the set on its own
+_open_streams = weakref.WeakSet()
+_reaper_lock = threading.Lock()
+_reaper = None
+
+class QueryStream:
+    """
+    One open SELECT whose rows are pulled a page at a time.
+    On PostgreSQL ``stream_results`` makes psycopg2 declare a named cursor, so
+    only the fetched pages ever leave the server. The stream holds a pooled
+    connection until it is exhausted, reaches a cap, is closed, or goes
+    ``idle_seconds`` without a fetch.
+    """
+    def __init__(self, query, page_rows=None, max_rows=None, max_bytes=None, idle_seconds=None):
+        self.query = query
+        self.page_rows = max(page_rows or EXPLORER_PAGE_ROWS, 1)
+        self.max_rows = max_rows or EXPLORER_MAX_ROWS
+        self.max_bytes = max_bytes or EXPLORER_MAX_BYTES
+        self.idle_seconds = idle_seconds or EXPLORER_STREAM_IDLE_SECONDS
+        self.pages = []
+        self.rows = 0
+        self.bytes = 0
+        self.columns = []
+        self.exhausted = False
+        self.truncated = False
+        self.expired = False
+        self.first_page_seconds = None
+        self.last_used = time.monotonic()
+        self._conn = None
+        self._result = None
+        # One row read past the last page, so the end is seen without an extra fetch
+        self._lookahead = []
+        self._lock = threading.Lock()
+
+    def open(self, timeout_ms=None, job=None):
+        """Start the query and fetch the first page"""
+        start = time.perf_counter()
+        self._conn = engine.connect()
+        try:
+            if job is not None:
+                job.attach(self._conn)
+            # The budget covers the DECLARE and every later FETCH
+            apply_timeout(self._conn, timeout_ms)
+            self._result = self._conn.execute(
+                text(self.query),
+                execution_options={'stream_results': True, 'max_row_buffer': self.page_rows}
+            )
+            self.columns = list(self._result.keys())
+            _watch(self)
+            self.fetch_next()
+        except Exception:
+            self.close()
+            raise
+        self.first_page_seconds = time.perf_counter() - start
+        return self
+
+    @property
+    def is_open(self):
+        return self._result is not None
+
+    def fetch_next(self):
+        """Fetch the next page; returns the new rows as a DataFrame"""
+        with self._lock:
+            if not self.is_open:
+                return pd.DataFrame(columns=self.columns)
+            self.last_used = time.monotonic()
+            size = min(self.page_rows, self.max_rows - self.rows)
+            rows = self._lookahead + self._result.fetchmany(size + 1 - len(self._lookahead))
+            rows, self._lookahead = rows[:size], rows[size:]
+            page = pd.DataFrame.from_records(rows, columns=self.columns)
+            self.pages.append(page)
+            self.rows += len(page)
+            self.bytes += int(page.memory_usage(deep=True).sum())
+            if not self._lookahead:
+                self.exhausted = True
+            elif self.rows >= self.max_rows or self.bytes >= self.max_bytes:
+                self.truncated = True
+        if self.exhausted or self.truncated:
+            self.close()
+        return page
+
+    def frame(self):
+        """All rows fetched so far"""
+        if not self.pages:
+            return pd.DataFrame(columns=self.columns)
+        if len(self.pages) > 1:
+            # Keep a single block so repeated renders don't re-concatenate
+            self.pages = [pd.concat(self.pages, ignore_index=True)]
+        return self.pages[0]
+
+    def close(self):
+        """Release the cursor and return the connection to the pool"""
+        with self._lock:
+            result, conn = self._result, self._conn
+            self._result = self._conn = None
+            self._lookahead = []
+        _open_streams.discard(self)
+        if result is not None:
+            try:
+                result.close()
+            except Exception:
+                pass
+        if conn is not None:
+            try:
+                conn.rollback()
+                conn.close()
+            except Exception:
+                pass
+
+    def expire(self):
+        """Close the stream if it has gone ``idle_seconds`` without a fetch"""
+        if self.is_open and time.monotonic() - self.last_used > self.idle_seconds:
+            self.expired = True
+            self.close()
+        return self.expired
+
+def _reap():
+    while True:
+        for stream in list(_open_streams):
+            stream.expire()
+        time.sleep(max(min(EXPLORER_STREAM_IDLE_SECONDS / 4, 15), 1))
+
+def _watch(stream):
+    """Track an open stream, starting the reaper thread once per process"""
+    global _reaper
+    _open_streams.add(stream)
+    with _reaper_lock:
+        if _reaper is None:
+            _reaper = threading.Thread(target=_reap, name="stream-reaper", daemon=True)
+            _reaper.start()
+
+def open_stream(query, page_rows=None, max_rows=None, max_bytes=None, timeout_ms=None, job=None):
+    """
+    Open a streamed SELECT
+    Returns: (stream, error_message)
+    """
+    start = time.perf_counter()
+    stream = QueryStream(query, page_rows, max_rows, max_bytes)
+    try:
+        stream.open(timeout_ms, job)
+    except Exception as e:
+        if job is not None:
+            job.exception = e
+        telemetry.record(query, time.perf_counter() - start, error=str(e), panel="SQL Editor")
+        return None, f"❌ Error: {str(e)}"
+    telemetry.record(query, stream.first_page_seconds, stream.frame(), panel="SQL Editor")
+    return stream, None
@@ -0,0 +1,126 @@
+"""
+Per-table change watermarks used to key cached query results
+A cached result stays valid until one of the tables it reads changes
+"""
+import re
+import threading
+import time
+from sqlalchemy import bindparam, text
+from config import engine, TABLES, TABLE_VERSION_POLL_SECONDS, TABLE_VERSION_FALLBACK_TTL
+from local_db import BUILD_TABLE, VERSIONS_TABLE
+
+# Quoted identifiers keep their case; bare ones are folded like Postgres does
+_IDENTIFIER = re.compile(r'"([^"]+)"|\b([A-Za-z_]\w*)\b')
+
+_WATERMARK_SQL = text("""
+    SELECT relname, n_tup_ins + n_tup_upd + n_tup_del AS changes
+    FROM pg_stat_user_tables
+    WHERE schemaname = 'public'
+""")
+
+# The embedded database keeps its own counters; the build id makes them
+# differ across rebuilds, which restart them at 0
+_LOCAL_WATERMARK_SQL = text(f"""
+    SELECT v.table_name, b.build_id || ':' || CAST(v.version AS VARCHAR) AS changes
+    FROM {VERSIONS_TABLE} v CROSS JOIN {BUILD_TABLE} b
+""")
+
+_lock = threading.Lock()
+_watermarks = {}
+_generations = {}
+_polled_at = 0.0
+_poll_failed = False
+
+def referenced_tables(sql):
+    """
+    Known tables mentioned in ``sql``, sorted.
+    Over-matching (e.g. an alias named like a table) only costs an extra
+    invalidation, so any identifier equal to a table name counts.
+    """
+    found = set()
+    for quoted, bare in _IDENTIFIER.findall(sql):
+        if quoted:
+            name = quoted
+        elif bare.lower() == "order":
+            # Unquoted ORDER is the keyword; the table is always "order"
+            continue
+        else:
+            name = bare.lower()
+        if name in TABLES:
+            found.add(name)
+    return tuple(sorted(found))
+
+def _fetch_watermarks():
+    """Read per-table modification counters, or None if unavailable"""
+    if engine is None:
+        return None
+    local = engine.dialect.name != "postgresql"
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(_LOCAL_WATERMARK_SQL if local else _WATERMARK_SQL).fetchall()
+    except Exception:
+        return None
+    return {relname: changes if local else int(changes) for relname, changes in rows}
+
+def record_write(conn, tables):
+    """
+    Bump the stored counters of ``tables`` inside the writing transaction.
+    Only the embedded database needs this; PostgreSQL counts on its own.
+    """
+    if tables and conn.dialect.name != "postgresql":
+        conn.execute(text(f"UPDATE {VERSIONS_TABLE} SET version = version + 1 WHERE table_name IN :tables")
+                     .bindparams(bindparam("tables", expanding=True)), {'tables': list(tables)})
+
+def _refresh():
+    """Poll the server watermarks at most once per poll interval"""
+    global _polled_at, _poll_failed
+    now = time.monotonic()
+    with _lock:
+        if now - _polled_at < TABLE_VERSION_POLL_SECONDS:
+            return
+        # Claim this poll so concurrent callers keep using the last snapshot
+        _polled_at = now
+    marks = _fetch_watermarks()
+    with _lock:
+        _poll_failed = marks is None
+        if marks is not None:
+            _watermarks.clear()
+            _watermarks.update(marks)
+
+def versions_for(sql, at=None):
+    """
+    Version tuple for the tables ``sql`` reads; part of every cache key.
+    ``at`` (epoch seconds) gives the time-based part for a later moment.
+    """
+    _refresh()
+    tables = referenced_tables(sql)
+    bucket = int((time.time() if at is None else at) // max(TABLE_VERSION_FALLBACK_TTL, 1))
+    if not tables:
+        # Nothing to watch (catalog queries, SELECT 1): expire on time instead
+        return (("*", f"t{bucket}"),)
+    with _lock:
+        if _poll_failed:
+            # No watermarks: fall back to time-based expiry
+            return tuple((t, f"t{bucket}.{_generations.get(t, 0)}") for t in tables)
+        return tuple((t, f"{_watermarks.get(t)}.{_generations.get(t, 0)}") for t in tables)
+
+def watermarks(tables):
+    """Change counters of ``tables`` as last polled, or None when they could not be read"""
+    _refresh()
+    with _lock:
+        if _poll_failed:
+            return None
+        return tuple((t, _watermarks.get(t)) for t in tables)
+
+def generations(tables):
+    """Per-table count of invalidate() calls; changes only on this app's own writes"""
+    with _lock:
+        return tuple(_generations.get(t, 0) for t in tables)
+
+def invalidate(tables):
+    """Mark ``tables`` as changed right away (e.g. after a committed write)"""
+    global _polled_at
+    with _lock:
+        for table in tables:
+            _generations[table] = _generations.get(table, 0) + 1
+        _polled_at = 0.0
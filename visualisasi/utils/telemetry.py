@@ -0,0 +1,60 @@
+"""
+Query telemetry - bounded in-process ring buffer with optional JSONL sink
+"""
+import contextvars
+import json
+import threading
+import time
+from collections import deque
+from config import TELEMETRY_BUFFER_SIZE, TELEMETRY_LOG_PATH
+
+# Set by app.py for the page being rendered and by prefetch() per panel
+current_page = contextvars.ContextVar("current_page", default=None)
+current_panel = contextvars.ContextVar("current_panel", default=None)
+
+_records = deque(maxlen=max(TELEMETRY_BUFFER_SIZE, 1))
+_lock = threading.Lock()
+_sink_lock = threading.Lock()
+
+def _frame_bytes(df):
+    try:
+        return int(df.memory_usage(deep=True).sum())
+    except Exception:
+        return 0
+
+def record(sql, latency, df=None, cache="none", error=None, panel=None):
+    """
+    Store one query execution.
+    ``cache`` is 'memory' or 'disk' for a cache hit, 'miss' when the database
+    was queried by load_query, and 'none' for uncached (ad-hoc) statements.
+    """
+    entry = {
+        'timestamp': time.time(),
+        'page': current_page.get(),
+        'panel': panel or current_panel.get(),
+        'sql': " ".join(sql.split()),
+        'latency_ms': latency * 1000,
+        'rows': 0 if df is None else len(df),
+        'result_bytes': 0 if df is None else _frame_bytes(df),
+        'cache': cache,
+        'error': error,
+    }
+    with _lock:
+        _records.append(entry)
+    if TELEMETRY_LOG_PATH:
+        try:
+            with _sink_lock, open(TELEMETRY_LOG_PATH, "a", encoding="utf-8") as sink:
+                sink.write(json.dumps(entry) + "\n")
+        except OSError:
+            pass
+    return entry
+
+def records():
+    """Snapshot of the buffered records, oldest first"""
+    with _lock:
+        return list(_records)
+
+def clear():
+    """Drop all buffered records (the JSONL sink is left untouched)"""
+    with _lock:
+        _records.clear()
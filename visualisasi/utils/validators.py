@@ -1,10 +1,14 @@
 """
 SQL query validation and formatting utilities
 """
+import time
 import sqlparse
 from sqlalchemy import text
 import pandas as pd
 from config import engine
+from utils import telemetry
+from utils.query_control import apply_timeout
+from utils.table_versions import invalidate, record_write, referenced_tables
 
 def validate_sql_query(query):
     """
@@ -44,8 +48,13 @@ def format_sql(query):
         strip_comments=False
     )
 
-def execute_query_safe(query):
-    """Execute query with proper error handling and logging"""
+def execute_query_safe(query, timeout_ms=None, job=None):
+    """
+    Execute query with proper error handling and logging
+    ``timeout_ms`` caps the statement via SET LOCAL statement_timeout;
+    ``job`` (a QueryJob) is given the connection so the statement can be cancelled
+    """
+    start = time.perf_counter()
     try:
         from sqlalchemy import text
         
@@ -59,13 +68,31 @@ def execute_query_safe(query):
         if query_type in ['INSERT', 'UPDATE', 'DELETE']:
             # For write operations, use execute
             with engine.connect() as conn:
+                if job is not None:
+                    job.attach(conn)
+                apply_timeout(conn, timeout_ms)
                 result = conn.execute(text(query))
+                affected = result.rowcount
+                if (affected is None or affected < 0) and result.returns_rows:
+                    # DuckDB returns the count as a one-row result instead
+                    affected = result.scalar()
+                record_write(conn, referenced_tables(query))
                 conn.commit()
-                return pd.DataFrame({'affected_rows': [result.rowcount]}), None
+            # Cached results over the written tables are stale from now on
+            invalidate(referenced_tables(query))
+            df = pd.DataFrame({'affected_rows': [affected]})
         else:
             # For SELECT
-            df = pd.read_sql_query(query, engine)
-            return df, None
+            with engine.connect() as conn:
+                if job is not None:
+                    job.attach(conn)
+                apply_timeout(conn, timeout_ms)
+                df = pd.read_sql_query(query, conn)
+        telemetry.record(query, time.perf_counter() - start, df, panel="SQL Editor")
+        return df, None
             
     except Exception as e:
+        if job is not None:
+            job.exception = e
+        telemetry.record(query, time.perf_counter() - start, error=str(e), panel="SQL Editor")
         return None, f"❌ Error: {str(e)}"
@@ -0,0 +1,103 @@
+"""
+Background cache warm-up
+Runs dashboard panel queries (default view, no filters) when the app starts
+and again every WARMUP_INTERVAL_SECONDS, so visitors find the result caches
+warm after a restart, a data change or a time-based expiry. Only the
+WARMUP_PAGES modules and pages already visited are warmed, so the worker
+never imports a page nobody opened.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import engine, WARMUP_ENABLED, WARMUP_PAGES, WARMUP_WORKERS, WARMUP_INTERVAL_SECONDS, WARMUP_LEAD_SECONDS
+from utils import telemetry
+from utils.database import collect_sql, load_query, warm_ahead
+
+# Telemetry page label of warm-up queries, kept apart from visitor latency
+TELEMETRY_PAGE = "(warm-up)"
+
+_lock = threading.Lock()
+_thread = None
+
+# Progress of the worker, shown on the Performance page
+status = {'passes': 0, 'started_at': None, 'duration_s': None, 'tasks': 0, 'ahead': 0, 'errors': 0}
+
+def _run_task(label, task):
+    telemetry.current_page.set(TELEMETRY_PAGE)
+    telemetry.current_panel.set(label)
+    if callable(task):
+        return task()
+    return load_query(task)
+
+def page_tasks():
+    """(page title, tasks) for each WARMUP_PAGES or already visited page that defines tasks()"""
+    import page_modules
+
+    result = []
+    for page in page_modules.PAGES:
+        if page['module'] not in WARMUP_PAGES and not page_modules.is_loaded(page):
+            continue
+        module = page_modules.load(page)
+        if hasattr(module, "tasks"):
+            result.append((page['title'], module.tasks()))
+    return result
+
+def warm_pass(pool, lead=WARMUP_LEAD_SECONDS):
+    """
+    One pass over the warmed pages: run each panel task (a cache hit unless its
+    entry is missing or its tables changed), then refill keys that expire on
+    time within ``lead`` seconds. Returns the updated status.
+    """
+    started = time.time()
+    futures, ahead = [], []
+    for title, tasks in page_tasks():
+        for name, task in tasks.items():
+            # Fresh context per task, so nothing leaks between pool threads
+            futures.append(pool.submit(contextvars.Context().run, _run_task, f"{title}/{name}", task))
+        for sqls in collect_sql(tasks).values():
+            ahead.extend(pool.submit(warm_ahead, sql, lead) for sql in sqls)
+    errors = refreshed = 0
+    for future in futures:
+        try:
+            future.result()
+        except Exception:
+            errors += 1
+    for future in ahead:
+        try:
+            refreshed += bool(future.result())
+        except Exception:
+            errors += 1
+    status.update(passes=status['passes'] + 1, started_at=started, duration_s=time.time() - started,
+                  tasks=len(futures), ahead=refreshed, errors=errors)
+    return status
+
+def _loop():
+    with ThreadPoolExecutor(max_workers=max(WARMUP_WORKERS, 1), thread_name_prefix="warmup") as pool:
+        while True:
+            try:
+                warm_pass(pool)
+            except Exception:
+                status['errors'] += 1
+            time.sleep(max(WARMUP_INTERVAL_SECONDS, 1))
+
+def start():
+    """Start the warm-up thread once per process (no-op when disabled)"""
+    global _thread
+    if not WARMUP_ENABLED or engine is None:
+        return
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_loop, name="cache-warmup", daemon=True)
+            _thread.start()
+
+def describe():
+    """One-line status for the Performance page"""
+    if _thread is None:
+        return "Cache warm-up: off"
+    if not status['passes']:
+        return "Cache warm-up: first pass running"
+    age = time.time() - status['started_at']
+    passes = status['passes']
+    return (f"Cache warm-up: {passes} pass{'es' if passes != 1 else ''}, last {age:.0f}s ago in {status['duration_s']:.1f}s "
+            f"({status['tasks']} panels, {status['ahead']} refreshed ahead of expiry, {status['errors']} errors)")